@@ -1,6 +1,116 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QHBoxLayout, QLabel, QDateEdit
-from PyQt5.QtCore import QDate
-import sqlite3
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QPushButton, QTableView, QHBoxLayout, QLabel, QDateEdit, QComboBox
+)
+from PyQt5.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex
+from db import get_attendance_summary, get_attendance_page, ATTENDANCE_PAGE_SIZE
+from report_export import (
+    ReportExporter, attendance_rows, attendance_summary_rows,
+    ATTENDANCE_HEADERS, ATTENDANCE_SUMMARY_HEADERS
+)
+
+SUMMARY_MODE = "Summary per member"
+RECORDS_MODE = "Daily records"
+
+
+class AttendanceSummaryModel(QAbstractTableModel):
+    """get_attendance_summary rows, sortable by any column."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ATTENDANCE_SUMMARY_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ATTENDANCE_SUMMARY_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column() + 1]   # skip member_id
+        if role == Qt.DisplayRole:
+            if value is None:
+                return "—"
+            return f"{value:.1f}" if index.column() == 2 else str(value)
+        if role == Qt.TextAlignmentRole and index.column() in (1, 2, 4):
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0:
+            return  # no sort column: keep the query's order
+        self.layoutAboutToBeChanged.emit()
+        key = column + 1
+        self._rows.sort(key=lambda r: (r[key] is None, r[key] if key != 1 else (r[1] or "").lower()),
+                        reverse=order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class AttendanceRecordsModel(QAbstractTableModel):
+    """Raw attendance rows, newest first, paged in as the view scrolls.
+
+    Pages continue from the last loaded (date, member_id) so a deep scroll
+    costs the same per page as the first one.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._range = ("", "")
+        self._exhausted = True
+
+    def set_range(self, start, end):
+        self.beginResetModel()
+        self._range = (start, end)
+        self._rows = get_attendance_page(start, end)
+        self._exhausted = len(self._rows) < ATTENDANCE_PAGE_SIZE
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        last = self._rows[-1]
+        page = get_attendance_page(*self._range, after=(last[0], last[1]))
+        if len(page) < ATTENDANCE_PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ATTENDANCE_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ATTENDANCE_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        date, _, name = self._rows[index.row()]
+        return (name or "", date, "Present")[index.column()]
+
 
 class AttendanceReportWidget(QWidget):
     def __init__(self):
@@ -21,40 +131,61 @@ class AttendanceReportWidget(QWidget):
         self.end_date.setDate(QDate.currentDate())
         filter_layout.addWidget(self.end_date)
 
+        self.mode = QComboBox()
+        self.mode.addItems([SUMMARY_MODE, RECORDS_MODE])
+        filter_layout.addWidget(self.mode)
+
         self.generate_btn = QPushButton("Generate Report")
         self.generate_btn.clicked.connect(self.load_report)
         filter_layout.addWidget(self.generate_btn)
 
+        self.exporter = ReportExporter(self)
+        self.export_btn = QPushButton("Export")
+        self.export_btn.clicked.connect(lambda: self.exporter.export(*self._export_args()))
+        filter_layout.addWidget(self.export_btn)
+
+        self.pdf_btn = QPushButton("PDF")
+        self.pdf_btn.clicked.connect(lambda: self.exporter.export_pdf(*self._export_args()))
+        filter_layout.addWidget(self.pdf_btn)
+
         layout.addLayout(filter_layout)
 
+        self.summary = QLabel("")
+        layout.addWidget(self.summary)
+
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Member Name", "Date", "Status"])
+        self.summary_model = AttendanceSummaryModel(self)
+        self.records_model = AttendanceRecordsModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.summary_model)
         layout.addWidget(self.table)
 
         self.setLayout(layout)
 
+    def _range(self):
+        return (self.start_date.date().toString("yyyy-MM-dd"),
+                self.end_date.date().toString("yyyy-MM-dd"))
+
+    def _export_args(self):
+        if self.mode.currentText() == SUMMARY_MODE:
+            return ("Attendance Summary", ATTENDANCE_SUMMARY_HEADERS, attendance_summary_rows) + self._range()
+        return ("Attendance Report", ATTENDANCE_HEADERS, attendance_rows) + self._range()
+
     def load_report(self):
-        conn = sqlite3.connect("gym.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT m.name, a.date, a.status
-            FROM attendance a
-            JOIN members m ON a.member_id = m.id
-            WHERE a.date BETWEEN ? AND ?
-            ORDER BY a.date DESC
-        """, (
-            self.start_date.date().toString("yyyy-MM-dd"),
-            self.end_date.date().toString("yyyy-MM-dd")
-        ))
-        rows = cur.fetchall()
-        conn.close()
-
-        # Populate table
-        self.table.setRowCount(0)
-        for row_data in rows:
-            row_idx = self.table.rowCount()
-            self.table.insertRow(row_idx)
-            for col_idx, data in enumerate(row_data):
-                self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(data)))
+        start, end = self._range()
+        if self.mode.currentText() == SUMMARY_MODE:
+            rows = get_attendance_summary(start, end)
+            self.summary_model.set_rows(rows)
+            self.table.setModel(self.summary_model)
+            # Clear any previous sort so rows keep the most-present-first order
+            self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self.table.setSortingEnabled(True)
+            visited = sum(1 for r in rows if r[2])
+            self.summary.setText(f"{visited} of {len(rows)} members attended between {start} and {end}")
+        else:
+            # Sorting would force every page to load; records stay newest first
+            self.table.setSortingEnabled(False)
+            self.records_model.set_range(start, end)
+            self.table.setModel(self.records_model)
+            self.summary.setText("Newest first; more rows load as you scroll")
+        self.table.resizeColumnsToContents()
@@ -4,31 +4,21 @@ from PyQt5.QtWidgets import (
     QPushButton, QLabel, QDateEdit, QMessageBox
 )
 from PyQt5.QtCore import Qt, QDate
-from db import connect_db
+from db import connect_db, transaction
+from change_hub import shared_change_hub, changes_to
+
+# Members named per query when an import adds rows; older SQLite builds
+# allow 999 bound variables
+NAME_LOOKUP_BATCH = 500
 
 class AttendanceTab(QWidget):
     def __init__(self, refresh_callback=None):
         super().__init__()
         self.refresh_callback = refresh_callback
-        self._ensure_table()
+        self._loaded = {}    # member_id -> present, as read by load_for_date
+        self._changed = {}   # member_id -> present, only where it differs from _loaded
         self._init_ui()
-
-    # --- DB bootstrap ---------------------------------------------------------
-    def _ensure_table(self):
-        conn = connect_db()
-        cur = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                member_id INTEGER NOT NULL,
-                date TEXT NOT NULL,
-                status TEXT NOT NULL CHECK(status IN ('Present','Absent')),
-                UNIQUE(member_id, date) ON CONFLICT REPLACE,
-                FOREIGN KEY(member_id) REFERENCES members(id)
-            );
-        """)
-        conn.commit()
-        conn.close()
+        shared_change_hub().changed.connect(self.apply_changes)
 
     # --- UI -------------------------------------------------------------------
     def _init_ui(self):
@@ -64,6 +54,7 @@ class AttendanceTab(QWidget):
         self.table.setHorizontalHeaderLabels(["ID", "Member Name", "Present"])
         self.table.setColumnHidden(0, True)  # hide ID
         self.table.setSortingEnabled(True)
+        self.table.itemChanged.connect(self._on_item_changed)
         root.addWidget(self.table)
 
         self.setLayout(root)
@@ -78,6 +69,90 @@ class AttendanceTab(QWidget):
             if item is not None:
                 item.setCheckState(Qt.Checked if present else Qt.Unchecked)
 
+    def _rows_by_member(self):
+        return {int(self.table.item(r, 0).text()): r for r in range(self.table.rowCount())}
+
+    def _append_member(self, member_id, name, present):
+        # Callers turn sorting off first, so the row stays where it is put
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        id_item = QTableWidgetItem(str(member_id))
+        id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
+        name_item = QTableWidgetItem(name or "")
+        name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+        present_item = QTableWidgetItem()
+        present_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+        present_item.setCheckState(Qt.Checked if present else Qt.Unchecked)
+        for col, item in enumerate([id_item, name_item, present_item]):
+            self.table.setItem(row, col, item)
+
+    def apply_changes(self, changes):
+        """Add, drop or re-mark single rows for committed member and attendance changes."""
+        members = changes_to(changes, "members")
+        target_date = self.date_edit.date().toString("yyyy-MM-dd")
+        marks = {}
+        for change in changes_to(changes, "attendance_presence"):
+            if target_date in (change.old, change.new):
+                marks[change.row_id] = change.op != "delete"
+        # Our own save arrives here too; those marks are already shown
+        marks = {m: p for m, p in marks.items()
+                 if m in self._loaded and self._changed.get(m, self._loaded[m]) != p}
+        if not members and not marks:
+            return
+
+        self.table.blockSignals(True)
+        inserted = [c.row_id for c in members if c.op == "insert" and c.row_id not in self._loaded]
+        if inserted:
+            # One query per batch, and one sort once all rows are in
+            self.table.setSortingEnabled(False)
+            for i in range(0, len(inserted), NAME_LOOKUP_BATCH):
+                batch = inserted[i:i + NAME_LOOKUP_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                for member_id, name in connect_db().execute(
+                        f"SELECT id, name FROM members WHERE id IN ({placeholders})", batch):
+                    self._loaded[member_id] = False
+                    self._append_member(member_id, name, False)
+            self.table.setSortingEnabled(True)
+        deleted = {c.row_id for c in members if c.op == "delete"}
+        if deleted or marks:
+            rows = self._rows_by_member()
+            for member_id in deleted:
+                self._loaded.pop(member_id, None)
+                self._changed.pop(member_id, None)
+            for row in sorted((rows[m] for m in deleted if m in rows), reverse=True):
+                self.table.removeRow(row)
+            if deleted:
+                rows = self._rows_by_member()
+            for member_id, present in marks.items():
+                self._loaded[member_id] = present
+                self._changed.pop(member_id, None)
+                if member_id in rows:
+                    self.table.item(rows[member_id], 2).setCheckState(Qt.Checked if present else Qt.Unchecked)
+        self.table.blockSignals(False)
+
+    def clear_session(self):
+        """Undo unsaved marks, without re-reading the sheet."""
+        if not self._changed:
+            return
+        rows = self._rows_by_member()
+        self.table.blockSignals(True)
+        for member_id in self._changed:
+            if member_id in rows:
+                present = self._loaded.get(member_id, False)
+                self.table.item(rows[member_id], 2).setCheckState(Qt.Checked if present else Qt.Unchecked)
+        self.table.blockSignals(False)
+        self._changed = {}
+
+    def _on_item_changed(self, item):
+        if item.column() != 2:
+            return
+        member_id = int(self.table.item(item.row(), 0).text())
+        present = item.checkState() == Qt.Checked
+        if self._loaded.get(member_id) == present:
+            self._changed.pop(member_id, None)
+        else:
+            self._changed[member_id] = present
+
     # --- Data load/save --------------------------------------------------------
     def load_for_date(self):
         """Load members and prefill attendance for the selected date."""
@@ -85,18 +160,24 @@ class AttendanceTab(QWidget):
 
         conn = connect_db()
         cur = conn.cursor()
-        # Left-join attendance to prefill existing marks
+        # Only presence is stored; no row for the day means absent
         cur.execute("""
             SELECT m.id, m.name,
-                   COALESCE(a.status, 'Absent') AS status
+                   CASE WHEN a.member_id IS NULL THEN 'Absent' ELSE 'Present' END AS status
             FROM members m
-            LEFT JOIN attendance a
-              ON a.member_id = m.id AND a.date = ?
+            LEFT JOIN attendance_presence a
+              ON a.date = ? AND a.member_id = m.id
             ORDER BY m.name COLLATE NOCASE;
         """, (target_date,))
         rows = cur.fetchall()
-        conn.close()
 
+        self._loaded = {member_id: status == "Present" for member_id, _, status in rows}
+        self._changed = {}
+
+        # Filling the table must not count as edits, and sorting would move
+        # rows while they are being filled
+        self.table.blockSignals(True)
+        self.table.setSortingEnabled(False)
         self.table.setRowCount(0)
         for i, (member_id, name, status) in enumerate(rows):
             self.table.insertRow(i)
@@ -114,30 +195,33 @@ class AttendanceTab(QWidget):
             present_item.setCheckState(Qt.Checked if status == "Present" else Qt.Unchecked)
             self.table.setItem(i, 2, present_item)
 
+        self.table.setSortingEnabled(True)
+        self.table.blockSignals(False)
         self.table.resizeColumnsToContents()
 
     def save_attendance(self):
-        """Insert/replace rows for selected date."""
-        target_date = self.date_edit.date().toString("yyyy-MM-dd")
+        """Write the marks changed since load_for_date; absent members have no row."""
+        if not self._changed:
+            QMessageBox.information(self, "Saved", "No attendance changes to save.")
+            return
 
-        conn = connect_db()
-        cur = conn.cursor()
+        target_date = self.date_edit.date().toString("yyyy-MM-dd")
 
-        to_save = []
-        for r in range(self.table.rowCount()):
-            member_id = int(self.table.item(r, 0).text())
-            present = self.table.item(r, 2).checkState() == Qt.Checked
-            status = "Present" if present else "Absent"
-            to_save.append((member_id, target_date, status))
+        present, absent = [], []
+        for member_id, marked in self._changed.items():
+            (present if marked else absent).append((target_date, member_id))
 
-        cur.executemany("""
-            INSERT INTO attendance (member_id, date, status)
-            VALUES (?, ?, ?)
-            ON CONFLICT(member_id, date) DO UPDATE SET status=excluded.status;
-        """, to_save)
+        # rowcount, unlike total_changes, leaves out rows written by triggers
+        with transaction() as conn:
+            written = conn.executemany("""
+                INSERT OR IGNORE INTO attendance_presence (date, member_id) VALUES (?, ?)
+            """, present).rowcount
+            written += conn.executemany("""
+                DELETE FROM attendance_presence WHERE date = ? AND member_id = ?
+            """, absent).rowcount
 
-        conn.commit()
-        conn.close()
+        self._loaded.update(self._changed)
+        self._changed = {}
 
         if self.refresh_callback:
             try:
@@ -145,4 +229,4 @@ class AttendanceTab(QWidget):
             except Exception:
                 pass
 
-        QMessageBox.information(self, "Saved", "Attendance saved successfully.")
+        QMessageBox.information(self, "Saved", f"Attendance saved ({written} rows written).")
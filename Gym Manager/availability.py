@@ -0,0 +1,298 @@
+# availability.py
+"""Trainer availability from slot times and bookings.
+
+Slot times are stored as 24-hour "HH:MM" (migration v14 rewrote the old
+free-text ones). parse_slot() turns a slot into a half-open [start, end)
+interval in minutes after midnight, and DaySchedule indexes one date's
+bookings per trainer and per member. "Is this trainer free in this
+window" and "does this booking overlap" are then one binary search each.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, timedelta
+
+from db import connect_db, transaction
+
+_TIME = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?m\.?)?$", re.IGNORECASE)
+
+MINUTES_PER_DAY = 24 * 60
+
+Slot = namedtuple("Slot", "id start end gender")
+
+
+def parse_time(text):
+    """Minutes after midnight for a 24-hour or am/pm time, or None if unreadable.
+
+    Without am/pm the hour is on the 24-hour clock: "6:00" is 06:00.
+    """
+    match = _TIME.match((text or "").strip())
+    if not match:
+        return None
+    digits, minutes, half = match.groups()
+    hour, minute = int(digits), int(minutes or 0)
+    if minute > 59:
+        return None
+    if half:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if half.lower() == "p" else 0)
+    elif hour > 23:
+        return None
+    return hour * 60 + minute
+
+
+def is_ambiguous_time(text):
+    """True for a one-digit hour without am/pm ("6:00"), which may mean 06:00 or 18:00."""
+    match = _TIME.match((text or "").strip())
+    return bool(match) and len(match.group(1)) == 1 and not match.group(3) and match.group(1) != "0"
+
+
+def parse_slot(start_text, end_text):
+    """(start, end) minutes for a slot, or None if unreadable or empty."""
+    start, end = parse_time(start_text), parse_time(end_text)
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def slot_label(slot):
+    return f"{format_minutes(slot.start)} - {format_minutes(slot.end)} ({slot.gender})"
+
+
+def slot_allows(slot, gender):
+    """The booking gender rule: Mixed slots take anyone."""
+    return slot.gender == "Mixed" or slot.gender == gender
+
+
+def load_slots():
+    """All slots with readable times as {id: Slot}, ordered by start time."""
+    slots = []
+    for slot_id, start_text, end_text, gender in connect_db().execute(
+        "SELECT id, start_time, end_time, gender FROM slots"
+    ):
+        interval = parse_slot(start_text, end_text)
+        if interval is None:
+            print(f"Slot {slot_id} has unreadable times {start_text!r}-{end_text!r}; not offered for booking")
+            continue
+        slots.append(Slot(slot_id, interval[0], interval[1], gender))
+    slots.sort(key=lambda s: (s.start, s.end, s.id))
+    return {s.id: s for s in slots}
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals kept sorted by start.
+
+    ``_reach[i]`` is the latest end among the first i + 1 intervals, so an
+    overlap test stays a single bisect even when stored intervals overlap
+    each other (bookings made before overlaps were checked).
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._keys = []
+        self._reach = []
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start, end, key=None):
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._keys.insert(i, key)
+        self._reach.insert(i, end)
+        reach = self._reach[i - 1] if i else end
+        for j in range(i, len(self._reach)):
+            reach = max(reach, self._ends[j])
+            self._reach[j] = reach
+
+    def overlaps(self, start, end):
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._reach[i - 1] > start
+
+    def conflicts(self, start, end):
+        """Keys of the stored intervals overlapping [start, end)."""
+        found = []
+        j = bisect_left(self._starts, end) - 1
+        while j >= 0 and self._reach[j] > start:
+            if self._ends[j] > start:
+                found.append(self._keys[j])
+            j -= 1
+        return found[::-1]
+
+    def state_at(self, minute):
+        """(end of the intervals covering ``minute`` or None, next start after it or None)."""
+        busy_until = None
+        i = bisect_right(self._starts, minute)
+        j = i - 1
+        while j >= 0 and self._reach[j] > minute:
+            if self._ends[j] > minute:
+                busy_until = max(busy_until or 0, self._ends[j])
+            j -= 1
+        next_start = self._starts[i] if i < len(self._starts) else None
+        return busy_until, next_start
+
+
+class DaySchedule:
+    """One date's trainer bookings, indexed by trainer and by member.
+
+    Built from a single query on idx_bookings_date unless ``rows`` of
+    (id, trainer_id, member_id, slot_id, completed) are given. Bookings whose
+    slot has unreadable times cannot be placed and are left out. Completed
+    (released) sessions no longer hold the trainer's time, but they still
+    occupy their trainer and slot, which the booking can never take again.
+    """
+
+    def __init__(self, booking_date, slots=None, rows=None):
+        self.date = booking_date
+        self.slots = load_slots() if slots is None else slots
+        self.trainers = {}
+        self.members = {}
+        self.held = set()         # (trainer_id, slot_id) of completed sessions
+        if rows is None:
+            rows = connect_db().execute(
+                "SELECT id, trainer_id, member_id, slot_id, completed_at IS NOT NULL "
+                "FROM trainer_bookings WHERE booking_date = ?",
+                (booking_date,)
+            )
+        for row in rows:
+            self.add(*row)
+
+    def add(self, booking_id, trainer_id, member_id, slot_id, completed=False):
+        if completed:
+            self.held.add((trainer_id, slot_id))
+            return
+        slot = self.slots.get(slot_id)
+        if slot is None:
+            return
+        self.trainers.setdefault(trainer_id, IntervalIndex()).add(slot.start, slot.end, booking_id)
+        self.members.setdefault(member_id, IntervalIndex()).add(slot.start, slot.end, booking_id)
+
+    def trainer_free(self, trainer_id, start, end):
+        index = self.trainers.get(trainer_id)
+        return index is None or not index.overlaps(start, end)
+
+    def member_free(self, member_id, start, end):
+        index = self.members.get(member_id)
+        return index is None or not index.overlaps(start, end)
+
+    def free_trainers(self, trainer_ids, start, end):
+        """The trainers in ``trainer_ids`` with nothing booked in [start, end)."""
+        return [t for t in trainer_ids if self.trainer_free(t, start, end)]
+
+    def booking_problems(self, trainer_id, member_id, gender, slot):
+        """Reasons a booking cannot be made; an empty list means it can."""
+        problems = []
+        if gender is not None and not slot_allows(slot, gender):
+            problems.append(f"slot is for {slot.gender} members")
+        if (trainer_id, slot.id) in self.held:
+            problems.append("trainer already held a session in this slot")
+        elif not self.trainer_free(trainer_id, slot.start, slot.end):
+            problems.append("trainer is already booked in this time")
+        if member_id is not None and not self.member_free(member_id, slot.start, slot.end):
+            problems.append("member already has a session in this time")
+        return problems
+
+    def bookable_slots(self, trainer_id, member_id=None, gender=None):
+        """Slots the trainer (and member, if given) can still take this date."""
+        return [s for s in self.slots.values()
+                if not self.booking_problems(trainer_id, member_id, gender, s)]
+
+
+def load_schedules(dates, slots=None):
+    """{date: DaySchedule} for each ISO date in ``dates``, from one range query."""
+    slots = load_slots() if slots is None else slots
+    schedules = {d: DaySchedule(d, slots, rows=()) for d in dates}
+    if schedules:
+        for booking_date, *row in connect_db().execute("""
+            SELECT booking_date, id, trainer_id, member_id, slot_id, completed_at IS NOT NULL
+            FROM trainer_bookings WHERE booking_date BETWEEN ? AND ?
+        """, (min(schedules), max(schedules))):
+            schedule = schedules.get(booking_date)
+            if schedule is not None:
+                schedule.add(*row)
+    return schedules
+
+
+def series_dates(start, end, weekdays):
+    """ISO dates from ``start`` to ``end`` inclusive on ``weekdays`` (0 = Monday)."""
+    day, last = date.fromisoformat(start), date.fromisoformat(end)
+    dates = []
+    while day <= last:
+        if day.weekday() in weekdays:
+            dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+
+def plan_series(trainer_id, member, slot_ids, dates, slots=None):
+    """Check every (date, slot) of a booking series against the schedule.
+
+    ``member`` is a picker row (id, name, gender, phone, end_date). Returns
+    (bookable, conflicts): [(date, Slot)] and [(date, Slot, reason)].
+    Sessions accepted earlier in the series count against later ones, so
+    overlapping slots chosen together are caught too.
+    """
+    slots = load_slots() if slots is None else slots
+    member_id, _, gender, _, end_date = member
+    schedules = load_schedules(dates, slots)
+    bookable, conflicts = [], []
+    for booking_date in dates:
+        schedule = schedules[booking_date]
+        for slot_id in slot_ids:
+            slot = slots.get(slot_id)
+            if slot is None:
+                continue
+            problems = schedule.booking_problems(trainer_id, member_id, gender, slot)
+            if end_date and booking_date > end_date:
+                problems.append(f"membership ends {end_date}")
+            if problems:
+                conflicts.append((booking_date, slot, "; ".join(problems)))
+            else:
+                schedule.add(None, trainer_id, member_id, slot.id)
+                bookable.append((booking_date, slot))
+    return bookable, conflicts
+
+
+def book_series(trainer_id, member, slot_ids, dates):
+    """Validate and insert a booking series in one transaction.
+
+    The plan is made again under the write lock, so bookings made since a
+    preview cannot slip through. Every bookable session is inserted with a
+    single executemany; returns (bookable, conflicts) as plan_series.
+    """
+    with transaction(immediate=True) as conn:
+        bookable, conflicts = plan_series(trainer_id, member, slot_ids, dates)
+        conn.executemany("""
+            INSERT INTO trainer_bookings (trainer_id, member_id, slot_id, booking_date)
+            VALUES (?, ?, ?, ?)
+        """, [(trainer_id, member[0], slot.id, booking_date) for booking_date, slot in bookable])
+    return bookable, conflicts
+
+
+def trainer_status(schedule, trainer_id, minute):
+    """(status text, minute it next changes or None) for a trainer at ``minute``.
+
+    ``schedule`` is today's DaySchedule; the status is derived from it and
+    the clock rather than stored, so it never goes stale.
+    """
+    index = schedule.trainers.get(trainer_id)
+    if index is None:
+        return "Available", None
+    busy_until, next_start = index.state_at(minute)
+    if busy_until is not None:
+        return f"Training until {format_minutes(busy_until)}", busy_until
+    if next_start is not None:
+        return f"Available (next {format_minutes(next_start)})", next_start
+    return "Available", None
+
+
+def started_slot_ids(slots, minute):
+    """Ids of the slots that have started by ``minute``; Release completes only these."""
+    return [slot.id for slot in slots.values() if slot.start <= minute]
@@ -0,0 +1,87 @@
+# bench_attendance.py
+"""Attendance storage: presence-only table vs the old one-row-per-member layout.
+
+Usage: python bench_attendance.py [MEMBERS] [DAYS]   (default: 15000 members, 90 days)
+
+Fills attendance_presence at a 20% presence rate and, for comparison, a copy
+of the pre-v6 table (every member every day, Present/Absent) in the same
+file. Prints bytes on disk (table + indexes, via dbstat), the time of the
+report's date-range scan over each, and of the per-member summary and the
+first page of the raw records.
+"""
+import sys
+from datetime import date
+
+import db
+from bench_data import temp_database, seed_members, seed_attendance, timed
+
+LEGACY_SCHEMA = """
+    CREATE TABLE legacy_attendance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        member_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('Present','Absent')),
+        UNIQUE(member_id, date)
+    );
+    CREATE INDEX idx_legacy_attendance_date ON legacy_attendance(date);
+"""
+
+SCAN = """
+    SELECT m.name, a.date, {status}
+    FROM {table} a JOIN members m ON a.member_id = m.id
+    WHERE a.date BETWEEN ? AND ? {where}
+    ORDER BY a.date DESC
+"""
+
+
+def stored_bytes(conn, table):
+    return conn.execute("""
+        SELECT SUM(pgsize) FROM dbstat
+        WHERE name = ? OR name IN (SELECT name FROM sqlite_master WHERE tbl_name = ? AND type = 'index')
+    """, (table, table)).fetchone()[0]
+
+
+def scan(conn, sql, start, end):
+    return sum(1 for _ in conn.execute(sql, (start, end)))
+
+
+def main(members, days):
+    with temp_database() as path:
+        seed_members(members, booking_ratio=0)
+        first = seed_attendance(days)
+        conn = db.connect_db()
+        conn.executescript(LEGACY_SCHEMA)
+        with conn:
+            conn.execute("""
+                INSERT INTO legacy_attendance (member_id, date, status)
+                SELECT m.id, d.date,
+                       CASE WHEN p.member_id IS NULL THEN 'Absent' ELSE 'Present' END
+                FROM (SELECT DISTINCT date FROM attendance_presence) d
+                CROSS JOIN members m
+                LEFT JOIN attendance_presence p ON p.date = d.date AND p.member_id = m.id
+                ORDER BY d.date, m.id
+            """)
+        conn.execute("ANALYZE")
+
+        start, end = first.isoformat(), date.today().isoformat()
+        for label, table, status, where in (
+            ("dense (v5)", "legacy_attendance", "a.status", ""),
+            ("dense, present only", "legacy_attendance", "a.status", "AND a.status = 'Present'"),
+            ("presence (v6)", "attendance_presence", "'Present'", ""),
+        ):
+            rows, seconds = timed(scan, conn, SCAN.format(status=status, table=table, where=where), start, end)
+            print(f"{label:<20} {stored_bytes(conn, table) / 1e6:8.1f} MB  "
+                  f"scan {rows:>9} rows in {seconds * 1000:7.1f} ms")
+
+        rows, seconds = timed(db.get_attendance_summary, start, end)
+        print(f"summary of {len(rows)} members in {seconds * 1000:.1f} ms "
+              f"(bitmaps {stored_bytes(conn, 'attendance_months') / 1e6:.1f} MB)")
+        page, seconds = timed(db.get_attendance_page, start, end)
+        last = page[-1]
+        _, deep = timed(db.get_attendance_page, start, end, after=(last[0], last[1]))
+        print(f"records page in {seconds * 1000:.1f} ms, next page in {deep * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [15000, 90][len(args):]))
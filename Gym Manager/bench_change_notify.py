@@ -0,0 +1,70 @@
+# bench_change_notify.py
+"""UI cost of one edit: change-hub patching vs. reloading the views.
+
+Usage: python bench_change_notify.py [SIZE ...]   (default: 1000 20000)
+
+A Members model (every page loaded), payments ledger, dashboard and
+attendance sheet are open on the seeded database. "reload" is what showing
+fresh data cost before change notifications: re-query the members model
+and ledger, the dashboard summary and the attendance sheet. "patch" records
+a payment in a transaction() and lets the hub patch the same views; the
+time includes the write and commit. Qt parts run offscreen.
+"""
+import os
+import sys
+from datetime import date
+
+import db
+from bench_data import temp_database, seed_members, timed
+
+
+def main(sizes):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from attendance_tab import AttendanceTab
+    from change_hub import shared_change_hub, changes_to
+    from dashboard import DashboardWidget
+    from member_model import MemberTableModel
+    from payment_model import PaymentLedgerModel
+    app = QApplication.instance() or QApplication(sys.argv)
+    hub = shared_change_hub()
+
+    print(f"{'members':>8} {'reload (ms)':>12} {'patch (ms)':>11}")
+    for n in sizes:
+        with temp_database():
+            seed_members(n, booking_ratio=0.1)
+            members = MemberTableModel()
+            members.set_filters()
+            while members.canFetchMore():
+                members.fetchMore()
+            ledger = PaymentLedgerModel()
+            ledger.set_filters()
+            dashboard = DashboardWidget()
+            attendance = AttendanceTab()
+            # What MemberTable.apply_changes does for its model
+            hub.changed.connect(lambda changes: members.patch_members(
+                {c.row_id for c in changes_to(changes, "members")}))
+            hub.changed.connect(ledger.apply_changes)
+
+            def reload():
+                members.set_filters()
+                ledger.set_filters()
+                dashboard.refresh()
+                attendance.load_for_date()
+
+            def record_payment():
+                today = date.today().isoformat()
+                with db.transaction() as conn:
+                    db.insert_payment(n // 2, 25.0, today, today)
+                    conn.execute("UPDATE members SET end_date = date(end_date, '+30 days') WHERE id = ?",
+                                 (n // 2,))
+
+            _, reload_s = timed(reload)
+            _, patch_s = timed(record_payment)
+            print(f"{n:>8} {reload_s * 1000:>12.1f} {patch_s * 1000:>11.2f}")
+            hub.changed.disconnect()
+            app.processEvents()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 20000])
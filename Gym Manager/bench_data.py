@@ -0,0 +1,117 @@
+# bench_data.py
+"""Synthetic gym databases for the bench_*.py scripts.
+
+Nothing here is used by the application itself; it only builds throwaway
+databases of a given size so timings can be compared between versions.
+"""
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from time import perf_counter
+
+import db
+
+PLANS = ["Monthly", "Quarterly", "Yearly"]
+GENDERS = ["Male", "Female", "Other"]
+
+
+@contextmanager
+def temp_database(name="bench.db"):
+    """Point the db module at a fresh temporary file for the duration."""
+    old_name = db.DB_NAME
+    with tempfile.TemporaryDirectory() as tmp:
+        db.close_db()
+        db.DB_NAME = os.path.join(tmp, name)
+        try:
+            db.initialize_db()
+            yield db.DB_NAME
+        finally:
+            db.close_db()
+            db.DB_NAME = old_name
+
+
+def seed_members(n, booking_ratio=0.3, seed=327):
+    """Insert ``n`` members plus trainers, slots and upcoming bookings."""
+    rnd = random.Random(seed)
+    today = date.today()
+    conn = db.connect_db()
+
+    members = []
+    for i in range(1, n + 1):
+        start = today - timedelta(days=rnd.randint(0, 720))
+        end = start + timedelta(days=rnd.choice([30, 90, 365]))
+        members.append((
+            f"Member {i:06d}", f"017{i:08d}", f"member{i}@example.com",
+            f"{i} Gym Road", start.isoformat(), end.isoformat(),
+            rnd.choice(PLANS), rnd.choice(GENDERS), None,
+        ))
+
+    trainers = [(f"Trainer {t}", f"018{t:08d}", "Strength") for t in range(1, 21)]
+    slots = [("07:00", "09:00", "Male"), ("10:30", "12:30", "Female"), ("14:00", "16:00", "Male"),
+             ("17:00", "19:00", "Female")]
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO members (name, phone, email, address, start_date, end_date, membership_plan, gender, photo)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, members)
+        conn.executemany("INSERT INTO trainers (name, phone, specialization) VALUES (?, ?, ?)", trainers)
+        conn.executemany("INSERT INTO slots (start_time, end_time, gender) VALUES (?, ?, ?)", slots)
+
+        bookings = set()
+        for member_id in rnd.sample(range(1, n + 1), int(n * booking_ratio)):
+            for _ in range(rnd.randint(1, 3)):
+                key = (rnd.randint(1, len(trainers)), rnd.randint(1, len(slots)),
+                       (today + timedelta(days=rnd.randint(-30, 60))).isoformat())
+                if key not in bookings:
+                    bookings.add(key)
+                    conn.execute("""
+                        INSERT INTO trainer_bookings (trainer_id, member_id, slot_id, booking_date)
+                        VALUES (?, ?, ?, ?)
+                    """, (key[0], member_id, key[1], key[2]))
+
+
+def seed_attendance(days, present_ratio=0.2, seed=327):
+    """Mark a random ``present_ratio`` of members present on each of the last ``days`` days.
+
+    Returns the first date seeded.
+    """
+    rnd = random.Random(seed)
+    conn = db.connect_db()
+    member_ids = [r[0] for r in conn.execute("SELECT id FROM members")]
+    first = date.today() - timedelta(days=days - 1)
+    with conn:
+        for d in range(days):
+            day = (first + timedelta(days=d)).isoformat()
+            conn.executemany(
+                "INSERT INTO attendance_presence (date, member_id) VALUES (?, ?)",
+                [(day, m) for m in member_ids if rnd.random() < present_ratio]
+            )
+    return first
+
+
+def seed_payments(n, years=5, seed=327):
+    """Insert ``n`` payments for existing members spread over the last ``years`` years."""
+    rnd = random.Random(seed)
+    conn = db.connect_db()
+    max_id = conn.execute("SELECT MAX(id) FROM members").fetchone()[0] or 1
+    today = date.today()
+    span = years * 365
+    rows = []
+    for _ in range(n):
+        paid = today - timedelta(days=rnd.randint(0, span))
+        paid_day = db.to_day(paid.isoformat())
+        rows.append((rnd.randint(1, max_id), rnd.choice([150000, 400000, 1500000]), paid_day, paid_day + 30))
+    with conn:
+        conn.executemany("""
+            INSERT INTO payment_entries (member_id, amount_cents, paid_day, due_day) VALUES (?, ?, ?, ?)
+        """, rows)
+
+
+def timed(fn, *args, **kwargs):
+    """Run ``fn`` once and return (result, seconds)."""
+    t0 = perf_counter()
+    result = fn(*args, **kwargs)
+    return result, perf_counter() - t0
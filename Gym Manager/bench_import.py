@@ -0,0 +1,57 @@
+# bench_import.py
+"""Bulk CSV import throughput.
+
+Usage: python bench_import.py [ROWS]   (default: 100000)
+
+Writes a synthetic CSV (about 1% invalid rows, 60% with an opening
+payment), imports it into a throwaway database and reports rows/second.
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from bench_data import temp_database, timed
+from member_import import import_members, rejects_path_for
+
+HEADER = ["name", "phone", "email", "address", "gender", "start_date", "end_date",
+          "membership_plan", "amount", "paid_date", "due_date"]
+
+
+def write_csv(path, rows, seed=327):
+    rnd = random.Random(seed)
+    today = date.today()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            start = today - timedelta(days=rnd.randint(0, 720))
+            end = start + timedelta(days=rnd.choice([30, 90, 365]))
+            gender = rnd.choice(["Male", "Female", "Other"])
+            if rnd.random() < 0.01:
+                gender = "Unknown"  # rejected by validation
+            amount = f"{rnd.choice([1500, 4000, 15000])}" if rnd.random() < 0.6 else ""
+            writer.writerow([f"Import {i:06d}", f"019{i:08d}", f"import{i}@example.com", "Franchise St",
+                             gender, start.isoformat(), end.isoformat(),
+                             rnd.choice(["Monthly", "Quarterly", "Yearly"]), amount,
+                             start.isoformat() if amount else "", end.isoformat() if amount else ""])
+
+
+def main(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "members.csv")
+        _, seconds = timed(write_csv, path, rows)
+        print(f"wrote {rows} rows in {seconds:.2f}s")
+        with temp_database():
+            result = import_members(path)
+        print(f"imported {result.imported} members, {result.payments} payments, "
+              f"rejected {result.rejected} in {result.seconds:.2f}s "
+              f"-> {(result.imported + result.rejected) / result.seconds:,.0f} rows/s")
+        rejects = rejects_path_for(path)
+        print(f"rejects file: {os.path.getsize(rejects)} bytes" if os.path.exists(rejects) else "no rejects file")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,50 @@
+# bench_member_picker.py
+"""Member selection: full-roster QComboBox vs. type-ahead MemberPicker.
+
+Usage: python bench_member_picker.py [SIZE ...]   (default: 1000 100000)
+
+"combo" replays the old form setup: select every member and add each one
+to a QComboBox. "picker" is creating a MemberPicker, which loads nothing.
+"first" is the first find_members call on the new database (cold page
+cache) and "lookup" the slowest of a further pass over typical typed
+prefixes and substrings (active members only, as the booking dialog asks).
+Qt parts run offscreen.
+"""
+import os
+import sys
+
+import db
+from bench_data import temp_database, seed_members, timed
+
+TYPED = ["M", "Mem", "Member 04", "Member 099", "embe", "ember 0123", "01700004", "42", "zz"]
+
+
+def legacy_combo(combo_class):
+    rows = db.connect_db().execute("SELECT id, name FROM members").fetchall()
+    combo = combo_class()
+    for member_id, name in rows:
+        combo.addItem(f"{name} (ID:{member_id})", member_id)
+    return combo
+
+
+def main(sizes):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QComboBox
+    from member_picker import MemberPicker
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    print(f"{'members':>8} {'combo (s)':>10} {'picker (ms)':>12} {'first (ms)':>11} {'lookup (ms)':>12}")
+    for n in sizes:
+        with temp_database():
+            seed_members(n, booking_ratio=0)
+            db.connect_db().execute("ANALYZE")
+            _, combo = timed(legacy_combo, QComboBox)
+            _, picker = timed(MemberPicker)
+            _, first = timed(db.find_members, TYPED[0], active_only=True)
+            lookup = max(timed(db.find_members, text, active_only=True)[1] for text in TYPED)
+            print(f"{n:>8} {combo:>10.3f} {picker * 1000:>12.2f} {first * 1000:>11.2f} {lookup * 1000:>12.2f}")
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 100000])
@@ -0,0 +1,70 @@
+# bench_member_table.py
+"""Members tab fill time: per-row booking lookup vs. joined and paged queries.
+
+Usage: python bench_member_table.py [SIZE ...]   (default: 1000 10000 100000)
+
+"before" replays the old populate_table data path: one member query, then a
+fresh connection and trainer-booking query per row. "joined" is a single
+get_members() call and "page" is the first keyset page the Members tab
+model loads. When PyQt5 is installed the model reset + first fetchMore is
+timed too (offscreen).
+"""
+import os
+import sqlite3
+import sys
+
+import db
+from bench_data import temp_database, seed_members, timed
+
+LEGACY_BOOKING_QUERY = """
+    SELECT t.name, s.start_time || '-' || s.end_time || ' (' || s.gender || ')', tb.booking_date
+    FROM trainer_bookings tb
+    JOIN trainers t ON tb.trainer_id = t.id
+    JOIN slots s ON tb.slot_id = s.id
+    WHERE tb.member_id=? AND tb.booking_date>=date('now', 'localtime') AND tb.completed_at IS NULL
+    ORDER BY tb.booking_date LIMIT 1
+"""
+
+
+def legacy_fetch():
+    rows = db.connect_db().execute("SELECT id FROM members").fetchall()
+    for (member_id,) in rows:
+        conn = sqlite3.connect(db.DB_NAME)
+        conn.execute(LEGACY_BOOKING_QUERY, (member_id,)).fetchone()
+        conn.close()
+    return rows
+
+
+def make_table():
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        from member_table import MemberTable
+    except ImportError:
+        return None
+    app = QApplication.instance() or QApplication(sys.argv)
+    table = MemberTable()
+    table._bench_app = app
+    return table
+
+
+def main(sizes):
+    print(f"{'members':>8} {'before (s)':>11} {'joined (s)':>11} {'page (s)':>9} {'model (s)':>10}")
+    for n in sizes:
+        with temp_database():
+            seed_members(n)
+            _, before = timed(legacy_fetch)
+            _, joined = timed(db.get_members)
+            _, page = timed(db.get_members_page)
+
+            model = "n/a"
+            table = make_table()
+            if table is not None:
+                _, seconds = timed(table.model.set_filters)
+                model = f"{seconds:.3f}"
+
+            print(f"{n:>8} {before:>11.3f} {joined:>11.3f} {page:>9.4f} {model:>10}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,64 @@
+# bench_payments.py
+"""Payments report range scan: date() over text columns vs epoch-day index.
+
+Usage: python bench_payments.py [PAYMENTS]   (default: 1,000,000 over 5 years)
+
+Times the pre-v9 payments report query (date(paid_date) BETWEEN, run
+against the compatibility view) and iter_payments_report for one month,
+prints the on-disk size of payment_entries per row, and times the paged
+ledger: first page, a page 100 pages deep, a member's page, and recording
+one payment plus fetching its ledger row.
+"""
+import sys
+from datetime import date, timedelta
+
+import db
+from bench_data import temp_database, seed_members, seed_payments, timed
+
+LEGACY_QUERY = """
+    SELECT m.name, p.amount, p.paid_date, p.due_date
+    FROM payments p
+    JOIN members m ON m.id = p.member_id
+    WHERE date(p.paid_date) BETWEEN date(?) AND date(?)
+    ORDER BY p.paid_date ASC
+"""
+
+
+def main(payments):
+    with temp_database():
+        seed_members(10000, booking_ratio=0)
+        seed_payments(payments)
+        conn = db.connect_db()
+        conn.execute("ANALYZE")
+
+        end = date.today()
+        start, end = (end - timedelta(days=30)).isoformat(), end.isoformat()
+        old, old_s = timed(lambda: conn.execute(LEGACY_QUERY, (start, end)).fetchall())
+        new, new_s = timed(lambda: db.iter_payments_report(start, end).fetchall())
+        print(f"one month of {payments} payments: date() scan {old_s * 1000:.0f} ms, "
+              f"paid_day index {new_s * 1000:.0f} ms ({len(new)} rows, "
+              f"{'same' if sorted(old) == sorted(new) else 'DIFFERENT'} result)")
+
+        size = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'payment_entries'").fetchone()[0]
+        print(f"payment_entries: {size / payments:.1f} bytes per row on disk")
+
+        page, first_s = timed(db.get_payments_page)
+        for _ in range(99):
+            more = db.get_payments_page(after=(page[-1][0], page[-1][1]))
+            if not more:
+                break
+            page = more
+        _, deep_s = timed(db.get_payments_page, after=(page[-1][0], page[-1][1]))
+        _, member_s = timed(db.get_payments_page, member_id=42)
+
+        def record():
+            with conn:
+                payment_id = db.insert_payment(42, 1500.0, end, end)
+            return db.get_payment(payment_id)
+        _, record_s = timed(record)
+        print(f"ledger: first page {first_s * 1000:.1f} ms, deepest page {deep_s * 1000:.1f} ms, "
+              f"member page {member_s * 1000:.1f} ms, record payment {record_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
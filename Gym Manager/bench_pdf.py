@@ -0,0 +1,34 @@
+# bench_pdf.py
+"""PDF rendering throughput for the attendance report.
+
+Usage: python bench_pdf.py [ROWS]   (default: 150000, about 5,000 pages)
+
+Seeds a throwaway database with every member present every day and
+renders the attendance report, printing pages/second and peak RSS.
+"""
+import resource
+import sys
+from datetime import date
+
+from bench_data import temp_database, seed_members, seed_attendance, timed
+from report_export import attendance_rows, ATTENDANCE_HEADERS
+from report_pdf import render_pdf
+
+
+def main(rows, members=1000):
+    days = max(1, rows // members)
+    with temp_database() as path:
+        seed_members(members)
+        start = seed_attendance(days, present_ratio=1.0)
+
+        (pages, written), seconds = timed(
+            render_pdf, path + ".pdf", "Attendance Report", ATTENDANCE_HEADERS,
+            attendance_rows(start.isoformat(), date.today().isoformat())
+        )
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # KiB on Linux
+        print(f"{written} rows -> {pages} pages in {seconds:.1f}s "
+              f"({pages / seconds:.0f} pages/s, peak RSS {peak_mb:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150000)
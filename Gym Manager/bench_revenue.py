@@ -0,0 +1,50 @@
+# bench_revenue.py
+"""Revenue report: revenue_months rollup vs grouping the payments table.
+
+Usage: python bench_revenue.py [PAYMENTS]   (default: 1,000,000 over 5 years)
+
+Times the pre-rollup query (strftime/date() over every payment, now
+through the compatibility view) against iter_revenue_report for a whole-history range and for a range with partial
+months at both ends, then runs the rollup consistency check.
+"""
+import sys
+from datetime import date, timedelta
+
+import db
+from bench_data import temp_database, seed_members, seed_payments, timed
+from revenue_rollup import check_revenue_rollup
+
+LEGACY_QUERY = """
+    SELECT strftime('%Y-%m', paid_date) AS ym, SUM(amount)
+    FROM payments
+    WHERE date(paid_date) BETWEEN date(?) AND date(?)
+    GROUP BY ym
+    ORDER BY ym ASC
+"""
+
+
+def main(payments):
+    with temp_database():
+        seed_members(10000, booking_ratio=0)
+        _, seconds = timed(seed_payments, payments)
+        print(f"seeded {payments} payments in {seconds:.1f}s (rollup triggers included)")
+        conn = db.connect_db()
+
+        today = date.today()
+        ranges = (
+            ("5 years", (today - timedelta(days=5 * 365)).isoformat(), today.isoformat()),
+            ("1 year, mid-month", (today - timedelta(days=365)).replace(day=15).isoformat(), today.isoformat()),
+        )
+        for label, start, end in ranges:
+            old, old_s = timed(lambda: conn.execute(LEGACY_QUERY, (start, end)).fetchall())
+            new, new_s = timed(lambda: db.iter_revenue_report(start, end).fetchall())
+            same = [(m, round(t, 2)) for m, t in old] == [(m, round(t, 2)) for m, t in new]
+            print(f"{label:<18} scan {old_s * 1000:8.1f} ms  rollup {new_s * 1000:6.1f} ms  "
+                  f"({len(new)} months, {'same' if same else 'DIFFERENT'} totals)")
+
+        mismatches, seconds = timed(check_revenue_rollup)
+        print(f"consistency check: {len(mismatches)} mismatching months in {seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,98 @@
+# bench_startup.py
+"""Cold-start timing of the app: import, login, first paint, first tab.
+
+Usage: python bench_startup.py [MEMBERS]   (default: 10,000)
+
+Runs offscreen against a seeded temporary database, so it can run headless
+as a regression benchmark. Phases are timed in order: importing main,
+opening the database (migrations), building the login dialog and checking
+the credentials, MainWindow construction until its first paint, and the
+Members tab until it is built and showing rows ("usable"). Every other
+tab is then opened once and its build time listed, which is what the
+window used to pay up front. Run it in a fresh process: imports are only
+cold once.
+"""
+import os
+import sys
+from time import perf_counter
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+PHASE_TIMEOUT = 30.0
+
+
+def wait_for(app, done):
+    """Process events until ``done()`` is true; returns seconds waited."""
+    t0 = perf_counter()
+    while not done():
+        if perf_counter() - t0 > PHASE_TIMEOUT:
+            raise RuntimeError("timed out waiting for the window")
+        app.processEvents()
+    return perf_counter() - t0
+
+
+def main(members):
+    t0 = perf_counter()
+    import main as app_main
+    from PyQt5.QtCore import QObject, QEvent
+    from PyQt5.QtWidgets import QApplication
+    import_s = perf_counter() - t0
+
+    import db
+    from bench_data import temp_database, seed_members, seed_payments, timed
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with temp_database():
+        seed_members(members)
+        seed_payments(members * 5)
+        db.close_db()
+
+        _, open_s = timed(db.initialize_db)
+
+        def login():
+            dialog = app_main.LoginWindow()
+            dialog.username_input.setText("admin")
+            dialog.password_input.setText("admin123")
+            dialog.login()
+            return dialog.result()
+        accepted, login_s = timed(login)
+        assert accepted, "admin login failed"
+
+        class PaintWatch(QObject):
+            painted = False
+
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint:
+                    self.painted = True
+                return False
+
+        watch = PaintWatch()
+        t0 = perf_counter()
+        window = app_main.MainWindow()
+        window.installEventFilter(watch)
+        window.show()
+        wait_for(app, lambda: watch.painted)
+        paint_s = perf_counter() - t0
+        wait_for(app, lambda: window.member_table is not None and window.member_table.model.rowCount() > 0)
+        usable_s = perf_counter() - t0
+
+        print(f"{members} members")
+        print(f"  import main         {import_s * 1000:8.1f} ms")
+        print(f"  open database       {open_s * 1000:8.1f} ms")
+        print(f"  login               {login_s * 1000:8.1f} ms")
+        print(f"  first paint         {paint_s * 1000:8.1f} ms")
+        print(f"  members tab usable  {usable_s * 1000:8.1f} ms")
+        print(f"  total               {(import_s + open_s + login_s + usable_s) * 1000:8.1f} ms")
+
+        print("first open of the other tabs:")
+        for index in range(1, window.tabs.count()):
+            page = window.tabs.widget(index)
+            t0 = perf_counter()
+            window.tabs.setCurrentIndex(index)
+            wait_for(app, lambda: page.content is not None)
+            print(f"  {window.tabs.tabText(index):<19} {(perf_counter() - t0) * 1000:8.1f} ms")
+        window.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,35 @@
+# change_hub.py
+"""Qt side of the db change notifications.
+
+ChangeHub re-emits every committed batch of db.Change tuples as a signal.
+A batch committed on a worker thread (member import) is queued to the GUI
+thread by Qt; one committed on the GUI thread is delivered before the
+``with transaction()`` block returns, so a tab sees its own write at once.
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from db import add_change_listener
+
+
+def changes_to(changes, table):
+    """The Changes in ``changes`` that touched ``table``."""
+    return [c for c in changes if c.table == table]
+
+
+class ChangeHub(QObject):
+    changed = pyqtSignal(list)   # [db.Change] from one commit
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        add_change_listener(self.changed.emit)
+
+
+_shared = None
+
+
+def shared_change_hub():
+    """Process-wide hub (created on first use)."""
+    global _shared
+    if _shared is None:
+        _shared = ChangeHub()
+    return _shared
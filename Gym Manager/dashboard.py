@@ -1,12 +1,23 @@
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QGroupBox, QVBoxLayout
-from db import connect_db
-from datetime import datetime
+from PyQt5.QtCore import QTimer
+from db import get_membership_summary, count_expiring_between
+from change_hub import shared_change_hub, changes_to
+from datetime import datetime, timedelta
 
 class DashboardWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self.total = self.active = self.expired = 0
+        self.as_of = datetime.today().date()
+
+        # Fires just after midnight to move the day's expirations over
+        self.day_timer = QTimer(self)
+        self.day_timer.setSingleShot(True)
+        self.day_timer.timeout.connect(self.roll_forward)
+
         self.init_ui()
         self.setFixedHeight(50)
+        shared_change_hub().changed.connect(self.apply_changes)
     def init_ui(self):
         layout = QHBoxLayout()
 
@@ -26,20 +37,50 @@ class DashboardWidget(QWidget):
         self.refresh()
 
     def refresh(self):
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM members")
-        total = cursor.fetchone()[0]
+        """Re-read the counts from the trigger-maintained expiry buckets."""
+        self.as_of = datetime.today().date()
+        self.total, self.active, self.expired = get_membership_summary(self.as_of.isoformat())
+        self._update_labels()
+        self._schedule_rollover()
+
+    def apply_changes(self, changes):
+        """Adjust the counts by member inserts, deletes and end_date edits."""
+        members = changes_to(changes, "members")
+        if not members:
+            return
+        for change in members:
+            if change.op != "insert":
+                self._count(change.old, -1)
+            if change.op != "delete":
+                self._count(change.new, 1)
+        self._update_labels()
 
-        cursor.execute("SELECT COUNT(*) FROM members WHERE date(end_date) >= date('now')")
-        active = cursor.fetchone()[0]
+    def _count(self, end_date, step):
+        # Same split as get_membership_summary: no end date is neither
+        self.total += step
+        if end_date and end_date >= self.as_of.isoformat():
+            self.active += step
+        elif end_date:
+            self.expired += step
 
-        cursor.execute("SELECT COUNT(*) FROM members WHERE date(end_date) < date('now')")
-        expired = cursor.fetchone()[0]
+    def roll_forward(self):
+        """Move members whose end_date has passed since the last update."""
+        today = datetime.today().date()
+        if today > self.as_of:
+            moved = count_expiring_between(self.as_of.isoformat(), today.isoformat())
+            self.active -= moved
+            self.expired += moved
+            self.as_of = today
+            self._update_labels()
+        self._schedule_rollover()
 
-        conn.close()
+    def _schedule_rollover(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.day_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
 
+    def _update_labels(self):
         # Update labels
-        self.total_label.setText(f"Total Members: {total}")
-        self.active_label.setText(f"Active: {active}")
-        self.expired_label.setText(f"Expired: {expired}")
+        self.total_label.setText(f"Total Members: {self.total}")
+        self.active_label.setText(f"Active: {self.active}")
+        self.expired_label.setText(f"Expired: {self.expired}")
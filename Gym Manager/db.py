@@ -1,161 +1,755 @@
 import sqlite3
 import hashlib
-from datetime import datetime
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from math import floor
+
+from migrations import migrate
+
+DB_NAME = "gym.db"
+
+# Applied once to every new connection. WAL lets report reads run alongside
+# check-in writes; NORMAL sync is safe under WAL and avoids an fsync per commit.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),     # ~16 MB page cache (negative = KiB)
+    ("mmap_size", 268435456),   # 256 MB memory-mapped reads
+    ("busy_timeout", 5000),     # wait up to 5 s for a writer instead of failing
+    ("temp_store", "MEMORY"),
+)
+
+_local = threading.local()
+
 
 def connect_db():
-    return sqlite3.connect("gym.db")
+    """Return this thread's long-lived connection, opening it on first use.
+
+    Callers must not close the returned connection; write inside
+    ``with transaction() as conn:`` so a failed statement is rolled back
+    instead of lingering and the open tabs hear about the change.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_NAME:
+        return conn
+    if conn is not None:
+        conn.close()
+
+    conn = sqlite3.connect(DB_NAME)
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name}={value}")
+    _install_change_log(conn)
+    _local.conn = conn
+    _local.path = DB_NAME
+    return conn
+
+
+def close_db():
+    """Close this thread's connection (call on shutdown or thread exit)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+# --- Change notifications ----------------------------------------------------
+# Writes to these tables are logged as Change(table, row_id, op, old, new).
+# Table -> (column reported as row_id, column whose old / new value rides
+# along so listeners can act without a lookup, or None).
+CHANGE_TRACKED = {
+    "members": ("id", "end_date"),
+    "payment_entries": ("id", "paid_day"),
+    "attendance_presence": ("member_id", "date"),
+    "trainer_bookings": ("id", "member_id"),
+    "trainers": ("id", None),
+    "slots": ("id", None),
+}
+
+Change = namedtuple("Change", "table row_id op old new")
+
+_change_listeners = []
+
+
+def _install_change_log(conn):
+    """Create the per-connection change log and its triggers.
+
+    TEMP objects belong to this connection only, and the log rows are
+    written inside the same transaction as the change, so a rollback
+    discards them too. Skipped until migrations have created every tracked
+    table; initialize_db installs it again afterwards.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    if not existing.issuperset(CHANGE_TRACKED):
+        return
+    statements = ["CREATE TEMP TABLE IF NOT EXISTS change_log (tbl TEXT, row_id INTEGER, op TEXT, old, new)"]
+    for table, (key, value) in CHANGE_TRACKED.items():
+        for op, event in (("insert", "INSERT"), ("update", "UPDATE"), ("delete", "DELETE")):
+            ref = "old" if op == "delete" else "new"
+            old = f"old.{value}" if value and op != "insert" else "NULL"
+            new = f"new.{value}" if value and op != "delete" else "NULL"
+            statements.append(f"""
+                CREATE TEMP TRIGGER IF NOT EXISTS {table}_change_{op} AFTER {event} ON main.{table} BEGIN
+                    INSERT INTO change_log VALUES ('{table}', {ref}.{key}, '{op}', {old}, {new});
+                END""")
+    for statement in statements:
+        conn.execute(statement)
+
+
+def add_change_listener(listener):
+    """Call ``listener(changes)`` with the list of Changes of each committed write.
+
+    Listeners run on the thread that committed.
+    """
+    _change_listeners.append(listener)
+
+
+def remove_change_listener(listener):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+def notify_changes():
+    """Hand the changes committed on this thread's connection to the listeners.
+
+    transaction() calls this after its commit. Returns the list of Changes
+    delivered.
+    """
+    conn = connect_db()
+    try:
+        rows = conn.execute("SELECT tbl, row_id, op, old, new FROM temp.change_log ORDER BY rowid").fetchall()
+    except sqlite3.OperationalError:
+        return []   # schema not migrated yet
+    if not rows:
+        return []
+    with conn:
+        conn.execute("DELETE FROM temp.change_log")
+    changes = [Change(*row) for row in rows]
+    for listener in list(_change_listeners):
+        try:
+            listener(changes)
+        except Exception as e:
+            print("Change listener failed:", e)
+    return changes
+
+
+@contextmanager
+def transaction(immediate=False):
+    """``with conn:`` on this thread's connection, then notify_changes().
+
+    Listeners only hear about the write once it has committed; on an
+    exception it is rolled back and nothing is reported. ``immediate`` takes
+    the write lock up front (BEGIN IMMEDIATE) for read-check-write blocks.
+    """
+    conn = connect_db()
+    with conn:
+        if immediate:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Report only this transaction, not writes made outside transaction()
+            conn.execute("DELETE FROM temp.change_log")
+        except sqlite3.OperationalError:
+            pass   # schema not migrated yet
+        yield conn
+    notify_changes()
 
 
 def initialize_db():
+    """Create or upgrade the schema in place and make sure admin exists."""
     conn = connect_db()
-    cursor = conn.cursor()
-
-    # Members
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS members (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT,
-            email TEXT,
-            address TEXT,
-            start_date TEXT,
-            end_date TEXT,
-            membership_plan TEXT,
-            gender TEXT CHECK(gender IN ('Male','Female','Other')) NOT NULL,
-            photo TEXT
-        )
-    ''')
-
-    # Payments
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER,
-            amount REAL,
-            paid_date TEXT,
-            due_date TEXT,
-            FOREIGN KEY(member_id) REFERENCES members(id)
-        )   
-    ''')
-
-    # Attendance
-    cursor.execute('DROP TABLE IF EXISTS attendance')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS attendance (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            status TEXT NOT NULL,
-            UNIQUE(member_id, date),
-            FOREIGN KEY(member_id) REFERENCES members(id)
-        )   
-    ''')
-
-    # Users
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        )   
-    ''')
-
-    # Slots
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS slots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            start_time TEXT NOT NULL,
-            end_time TEXT NOT NULL,
-            gender TEXT CHECK(gender IN ('Male','Female','Other')) NOT NULL
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS member_slots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER NOT NULL,
-            slot_id INTEGER NOT NULL,
-            FOREIGN KEY(member_id) REFERENCES members(id),
-            FOREIGN KEY(slot_id) REFERENCES slots(id),
-            UNIQUE(member_id, slot_id)
-        )
-    ''')
-
-    # Trainers
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS trainers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT,
-            specialization TEXT,
-            status TEXT CHECK(status IN ('Available','Training')) DEFAULT 'Available'
-        )
-    ''')
-
-    # Trainer Bookings
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS trainer_bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trainer_id INTEGER NOT NULL,
-            member_id INTEGER NOT NULL,
-            slot_id INTEGER NOT NULL,
-            booking_date TEXT NOT NULL,
-            FOREIGN KEY(trainer_id) REFERENCES trainers(id),
-            FOREIGN KEY(member_id) REFERENCES members(id),
-            FOREIGN KEY(slot_id) REFERENCES slots(id),
-            UNIQUE(trainer_id, slot_id, booking_date)
-        )
-    ''')
+    migrate(conn)
+    _install_change_log(conn)
 
     # Insert default admin
     pw = hashlib.sha256("admin123".encode()).hexdigest()
-    cursor.execute("SELECT * FROM users WHERE username=?", ("admin",))
-    if cursor.fetchone() is None:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", ("admin", pw))
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users WHERE username=?", ("admin",))
+        if cursor.fetchone() is None:
+            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", ("admin", pw))
 
-    conn.commit()
-    conn.close()
 
+# Each member's next upcoming trainer booking, ranked in one pass so the
+# member list does not need a query per row.
+NEXT_BOOKING_CTE = """
+    WITH next_booking AS (
+        SELECT tb.member_id,
+               t.name AS trainer_name,
+               s.start_time || '-' || s.end_time || ' (' || s.gender || ')' AS slot_info,
+               tb.booking_date,
+               ROW_NUMBER() OVER (
+                   PARTITION BY tb.member_id ORDER BY tb.booking_date, tb.id
+               ) AS rn
+        FROM trainer_bookings tb
+        JOIN trainers t ON tb.trainer_id = t.id
+        JOIN slots s ON tb.slot_id = s.id
+        WHERE tb.booking_date >= date('now', 'localtime') AND tb.completed_at IS NULL
+    )
+"""
 
-# Fetch members with filters and search
-def get_members(plan="All", status="All", search=""):
-    conn = connect_db()
-    cursor = conn.cursor()
 
-    query = "SELECT id, name, phone, email, address, start_date, end_date, membership_plan, photo FROM members WHERE 1=1"
+MEMBER_COLUMNS = """
+    SELECT m.id, m.name, m.phone, m.email, m.gender, m.address,
+           m.start_date, m.end_date, m.membership_plan, m.photo,
+           nb.trainer_name, nb.slot_info, nb.booking_date
+    FROM members m
+    LEFT JOIN next_booking nb ON nb.member_id = m.id AND nb.rn = 1"""
+
+# Rows fetched per fetchMore() on the Members tab
+MEMBER_PAGE_SIZE = 200
+
+# The trigram tokenizer cannot match terms shorter than three characters
+FTS_MIN_CHARS = 3
+
+
+def has_member_search_index():
+    """True when members_fts exists in the current database."""
+    row = connect_db().execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='members_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def _member_query(plan, status, search):
+    """Build the shared member SELECT.
+
+    Returns (sql, params, rank_order); ``rank_order`` is an ORDER BY clause
+    for best-match-first results, or "" when no full-text search applies.
+    """
+    join = ""
+    query = " WHERE 1=1"
     params = []
+    rank_order = ""
+
+    if search:
+        if len(search) >= FTS_MIN_CHARS and has_member_search_index():
+            # Quote as a phrase so user input is never parsed as FTS syntax
+            phrase = '"' + search.replace('"', '""') + '"'
+            join = """
+    JOIN (SELECT rowid AS id, rank FROM members_fts WHERE members_fts MATCH ?) hits
+      ON hits.id = m.id"""
+            params.append(phrase)
+            rank_order = " ORDER BY hits.rank"
+        else:
+            search_like = f"%{search}%"
+            query += " AND (m.name LIKE ? OR m.phone LIKE ? OR m.email LIKE ?)"
+            params.extend([search_like, search_like, search_like])
 
     if plan != "All":
-        query += " AND membership_plan=?"
+        query += " AND m.membership_plan=?"
         params.append(plan)
 
     if status != "All":
         today = datetime.today().strftime("%Y-%m-%d")
         if status == "Active":
-            query += " AND end_date>=?"
+            query += " AND m.end_date>=?"
             params.append(today)
         else:  # Expired
-            query += " AND end_date<?"
+            query += " AND m.end_date<?"
             params.append(today)
 
-    if search:
-        search_like = f"%{search}%"
-        query += " AND (name LIKE ? OR phone LIKE ? OR email LIKE ?)"
-        params.extend([search_like, search_like, search_like])
+    return NEXT_BOOKING_CTE + MEMBER_COLUMNS + join + query, params, rank_order
+
 
-    cursor.execute(query, params)
+# Fetch members with filters and search
+def get_members(plan="All", status="All", search=""):
+    """Return member rows with their next booking attached.
+
+    Row layout: id, name, phone, email, gender, address, start_date,
+    end_date, membership_plan, photo, trainer_name, slot_info, booking_date.
+    The last three are NULL when the member has no upcoming booking.
+    Full-text matches come back best match first.
+    """
+    query, params, rank_order = _member_query(plan, status, search)
+    cursor = connect_db().cursor()
+    cursor.execute(query + rank_order, params)
     rows = cursor.fetchall()
-    conn.close()
     return rows
 
 
+def get_member_row(member_id, plan="All", status="All", search=""):
+    """One member in the get_members layout, or None if missing or filtered out."""
+    query, params, _ = _member_query(plan, status, search)
+    return connect_db().execute(query + " AND m.id = ?", params + [member_id]).fetchone()
+
+
+def get_members_page(plan="All", status="All", search="", after_id=0, limit=MEMBER_PAGE_SIZE):
+    """Return the next ``limit`` members with id > ``after_id`` (keyset paging).
+
+    Same row layout as get_members, ordered by id so paging stays stable.
+    """
+    query, params, _ = _member_query(plan, status, search)
+    cursor = connect_db().cursor()
+    cursor.execute(query + " AND m.id > ? ORDER BY m.id LIMIT ?", params + [after_id, limit])
+    return cursor.fetchall()
+
+
+# Rows offered by the type-ahead member picker
+MEMBER_PICKER_LIMIT = 20
+
+
+def _like_prefix(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def find_members(text, limit=MEMBER_PICKER_LIMIT, active_only=False):
+    """Members matching typed ``text``: (id, name, gender, phone, end_date).
+
+    Name-prefix matches come first in name order, read off idx_members_name.
+    If they do not fill ``limit`` and the text is long enough, substring
+    matches on name, phone or email from members_fts follow in id order.
+    They are not ranked: ranking scores every hit, and a short substring
+    like "embe" hits the whole roster, while unranked hits stop at ``limit``.
+    All-digit text also matches a member id exactly.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    conn = connect_db()
+    columns = "SELECT m.id, m.name, m.gender, m.phone, m.end_date FROM members m"
+    active = " AND m.end_date >= date('now', 'localtime')" if active_only else ""
+
+    rows = []
+    if text.isdigit():
+        rows += conn.execute(columns + " WHERE m.id = ?" + active, (int(text),)).fetchall()
+    rows += conn.execute(
+        columns + " WHERE m.name LIKE ? ESCAPE '\\'" + active + " ORDER BY m.name COLLATE NOCASE LIMIT ?",
+        (_like_prefix(text), limit)
+    ).fetchall()
+
+    if len(rows) < limit and len(text) >= FTS_MIN_CHARS and has_member_search_index():
+        phrase = '"' + text.replace('"', '""') + '"'
+        rows += conn.execute(columns + """
+            JOIN members_fts f ON f.rowid = m.id
+            WHERE members_fts MATCH ?""" + active + " LIMIT ?", (phrase, limit + len(rows))
+        ).fetchall()
+
+    seen = set()
+    unique = []
+    for row in rows:
+        if row[0] not in seen:
+            seen.add(row[0])
+            unique.append(row)
+    return unique[:limit]
+
+
+def get_membership_summary(today=None):
+    """Return (total, active, expired) from the trigger-maintained buckets.
+
+    Active means end_date >= ``today`` (default: local today, YYYY-MM-DD).
+    """
+    today = today or datetime.today().strftime("%Y-%m-%d")
+    row = connect_db().execute("""
+        SELECT COALESCE(SUM(members), 0),
+               COALESCE(SUM(CASE WHEN end_date >= ? THEN members END), 0),
+               COALESCE(SUM(CASE WHEN end_date <> '' AND end_date < ? THEN members END), 0)
+        FROM member_expiry_buckets
+    """, (today, today)).fetchone()
+    return row
+
+
+def count_expiring_between(start, end):
+    """Members whose end_date falls in [start, end) - i.e. expire as days pass."""
+    row = connect_db().execute("""
+        SELECT COALESCE(SUM(members), 0) FROM member_expiry_buckets
+        WHERE end_date >= ? AND end_date < ?
+    """, (start, end)).fetchone()
+    return row[0]
+
+
+# --- Reports -----------------------------------------------------------------
+# These return the live cursor so callers can stream rows (exports) or
+# fetchall() them (tables) from the same SQL.
+
+# Payments are stored as epoch days and integer cents (payment_entries);
+# these convert to and from the 'YYYY-MM-DD' strings and float amounts the
+# widgets work with.
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def to_day(text):
+    """'YYYY-MM-DD' -> days since 1970-01-01; None/'' -> None."""
+    if not text:
+        return None
+    return date.fromisoformat(text[:10]).toordinal() - _EPOCH
+
+
+def from_day(day):
+    """Days since 1970-01-01 -> 'YYYY-MM-DD'; None -> None."""
+    return None if day is None else date.fromordinal(day + _EPOCH).isoformat()
+
+
+def to_cents(amount):
+    """Amount in currency units -> integer cents, rounded like SQLite's ROUND()."""
+    return None if amount is None else floor(float(amount) * 100 + 0.5)
+
+
+def from_cents(cents):
+    return None if cents is None else cents / 100
+
+
+def iter_payments_report(start, end):
+    """(member name, amount, paid_date, due_date) paid within [start, end]."""
+    return connect_db().execute("""
+        SELECT m.name, p.amount_cents / 100.0,
+               date(p.paid_day * 86400, 'unixepoch'), date(p.due_day * 86400, 'unixepoch')
+        FROM payment_entries p
+        JOIN members m ON m.id = p.member_id
+        WHERE p.paid_day BETWEEN ? AND ?
+        ORDER BY p.paid_day ASC;
+    """, (to_day(start), to_day(end)))
+
+
+PAYMENT_PAGE_SIZE = 200
+
+_PAYMENT_COLUMNS = """
+    SELECT p.paid_day, p.id, m.name, p.amount_cents / 100.0,
+           date(p.paid_day * 86400, 'unixepoch'), date(p.due_day * 86400, 'unixepoch'), p.member_id
+    FROM payment_entries p
+    LEFT JOIN members m ON m.id = p.member_id
+"""
+
+
+def get_payments_page(member_id=None, start=None, end=None, after=None, limit=PAYMENT_PAGE_SIZE):
+    """One page of the payments ledger, newest first.
+
+    Rows are (paid_day, id, member name, amount, paid_date, due_date,
+    member_id), ordered by (paid_day DESC, id DESC). ``member_id`` and the
+    inclusive ``start``/``end`` dates filter in SQL; pass the last row's
+    (paid_day, id) as ``after`` to get the next page.
+    """
+    sql = _PAYMENT_COLUMNS + " WHERE p.paid_day IS NOT NULL"
+    params = []
+    if member_id is not None:
+        sql += " AND p.member_id = ?"
+        params.append(member_id)
+    if start:
+        sql += " AND p.paid_day >= ?"
+        params.append(to_day(start))
+    if end:
+        sql += " AND p.paid_day <= ?"
+        params.append(to_day(end))
+    if after is not None:
+        sql += " AND (p.paid_day, p.id) < (?, ?)"
+        params += list(after)
+    sql += " ORDER BY p.paid_day DESC, p.id DESC LIMIT ?"
+    params.append(limit)
+    return connect_db().execute(sql, params).fetchall()
+
+
+def get_payment(payment_id):
+    """A single ledger row (same shape as get_payments_page) or None."""
+    return connect_db().execute(_PAYMENT_COLUMNS + " WHERE p.id = ?", (payment_id,)).fetchone()
+
+
+def insert_payment(member_id, amount, paid_date, due_date):
+    """Insert a payment and return its id.
+
+    Runs on the calling thread's connection, so inside a caller's
+    ``with transaction()`` block it is part of that transaction.
+    """
+    return connect_db().execute("""
+        INSERT INTO payment_entries (member_id, amount_cents, paid_day, due_day)
+        VALUES (?, ?, ?, ?)
+    """, (member_id, to_cents(amount), to_day(paid_date), to_day(due_date))).lastrowid
+
+
+def iter_members_report():
+    """(name, phone, email, plan, end_date) for every member, by name."""
+    return connect_db().execute(
+        "SELECT name, phone, email, membership_plan, end_date FROM members ORDER BY name COLLATE NOCASE;"
+    )
+
+
+def _revenue_split(start, end):
+    """Split [start, end] into whole months and the partial-month day ranges.
+
+    Returns ((first month, last month), [(from date, to date exclusive), ...]);
+    the month pair is ('', '') when no month is fully covered.
+    """
+    s = datetime.strptime(start, "%Y-%m-%d").date()
+    after_end = datetime.strptime(end, "%Y-%m-%d").date() + timedelta(days=1)
+    first_full = s if s.day == 1 else (s.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after_full = after_end if after_end.day == 1 else after_end.replace(day=1)
+    if first_full >= after_full:
+        return ("", ""), [(s, after_end), (after_end, after_end)]
+    months = (first_full.strftime("%Y-%m"), (after_full - timedelta(days=1)).strftime("%Y-%m"))
+    return months, [(s, first_full), (after_full, after_end)]
+
+
+def iter_revenue_report(start, end):
+    """(YYYY-MM, total amount) for payments within [start, end].
+
+    Months the range covers completely are read from the revenue_months
+    rollup; only the days of a partial first or last month are summed
+    from payment_entries, through its (paid_day, amount_cents) index.
+    """
+    months, edges = _revenue_split(start, end)
+    params = list(months)
+    for day_from, day_to in edges:
+        params += [day_from.toordinal() - _EPOCH, day_to.toordinal() - _EPOCH]
+    return connect_db().execute("""
+        SELECT ym, SUM(cents) / 100.0 FROM (
+            SELECT month AS ym, total_cents AS cents FROM revenue_months WHERE month BETWEEN ? AND ?
+            UNION ALL
+            SELECT strftime('%Y-%m', paid_day * 86400, 'unixepoch'), amount_cents FROM payment_entries
+            WHERE paid_day >= ? AND paid_day < ?
+            UNION ALL
+            SELECT strftime('%Y-%m', paid_day * 86400, 'unixepoch'), amount_cents FROM payment_entries
+            WHERE paid_day >= ? AND paid_day < ?
+        )
+        GROUP BY ym
+        ORDER BY ym ASC;
+    """, params)
+
+
+def iter_attendance_report(start, end):
+    """(member name, date, 'Present') within [start, end], newest first.
+
+    Only presence is stored, so absences are not listed.
+    """
+    return connect_db().execute("""
+        SELECT m.name, a.date, 'Present'
+        FROM attendance_presence a
+        JOIN members m ON a.member_id = m.id
+        WHERE a.date BETWEEN ? AND ?
+        ORDER BY a.date DESC
+    """, (start, end))
+
+
+ATTENDANCE_PAGE_SIZE = 500
+
+
+def _months_in_range(start, end):
+    """month -> (ordinal, days in month, mask of its days inside [start, end])."""
+    months = {}
+    year, mon = int(start[:4]), int(start[5:7])
+    while f"{year:04d}-{mon:02d}" <= end[:7]:
+        month = f"{year:04d}-{mon:02d}"
+        ndays = monthrange(year, mon)[1]
+        first = int(start[8:10]) if month == start[:7] else 1
+        last = int(end[8:10]) if month == end[:7] else ndays
+        months[month] = (year * 12 + mon, ndays, ((1 << last) - 1) & ~((1 << (first - 1)) - 1))
+        year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return months
+
+
+def _longest_run(mask):
+    run = 0
+    while mask:
+        mask &= mask >> 1
+        run += 1
+    return run
+
+
+def get_attendance_summary(start, end):
+    """Per-member attendance over [start, end] from the monthly presence bitmaps.
+
+    Rows are (member_id, name, present days, attendance %, last visit,
+    longest streak), most present first; members with no visits are
+    included with zeros. Attendance % is relative to the days in the range
+    on which anyone was marked present, i.e. the days the gym was open.
+    Streaks are consecutive calendar days and may span month boundaries.
+    """
+    conn = connect_db()
+    months = _months_in_range(start, end)
+    open_days = dict.fromkeys(months, 0)   # month -> mask of days anyone attended
+    stats = {}   # member_id -> [days, longest streak, open run, last month ordinal, last month, last mask]
+
+    # Months in order, so each member's runs can be carried across month ends
+    for month, mid, mask in conn.execute("""
+        SELECT month, member_id, mask FROM attendance_months
+        WHERE month BETWEEN ? AND ?
+        ORDER BY month
+    """, (start[:7], end[:7])):
+        ordinal, ndays, in_range = months[month]
+        mask &= in_range
+        if not mask:
+            continue
+        open_days[month] |= mask
+
+        st = stats.get(mid)
+        if st is None:
+            st = stats[mid] = [0, 0, 0, 0, None, 0]
+        carry = st[2] if st[3] == ordinal - 1 else 0
+
+        full = (1 << ndays) - 1
+        if mask == full:
+            carry += ndays
+            if carry > st[1]:
+                st[1] = carry
+        else:
+            head = ((mask ^ (mask + 1)) >> 1).bit_length()      # run from the 1st
+            st[1] = max(st[1], carry + head, _longest_run(mask))
+            carry = ndays - (full & ~mask).bit_length()         # run to the month's last day
+        st[0] += bin(mask).count("1")
+        st[2:] = carry, ordinal, month, mask
+
+    total_open = sum(bin(m).count("1") for m in open_days.values())
+    rows = []
+    for mid, name in conn.execute("SELECT id, name FROM members"):
+        st = stats.get(mid)
+        if st is None:
+            rows.append((mid, name, 0, 0.0 if total_open else None, None, 0))
+            continue
+        days, best, _, _, month, mask = st
+        pct = round(100.0 * days / total_open, 1) if total_open else None
+        rows.append((mid, name, days, pct, f"{month}-{mask.bit_length():02d}", best))
+    rows.sort(key=lambda r: (-r[2], (r[1] or "").lower()))
+    return rows
+
+
+def get_attendance_page(start, end, after=None, limit=ATTENDANCE_PAGE_SIZE):
+    """One page of raw attendance rows (date, member_id, name), newest first.
+
+    Keyset paging on (date, member_id): pass the last row's (date,
+    member_id) as ``after`` to continue, so each page is a primary-key
+    range seek however deep the caller has scrolled.
+    """
+    sql = """
+        SELECT a.date, a.member_id, m.name
+        FROM attendance_presence a
+        JOIN members m ON a.member_id = m.id
+        WHERE a.date BETWEEN ? AND ?
+    """
+    params = [start, end]
+    if after is not None:
+        sql += " AND (a.date, a.member_id) < (?, ?)"
+        params += list(after)
+    sql += " ORDER BY a.date DESC, a.member_id DESC LIMIT ?"
+    params.append(limit)
+    return connect_db().execute(sql, params).fetchall()
+
+
+TRAINER_HISTORY_PAGE_SIZE = 200
+
+
+def get_trainer_history_page(trainer_id, after=None, limit=TRAINER_HISTORY_PAGE_SIZE):
+    """One page of a trainer's bookings, newest first.
+
+    Rows are (booking_date, id, member name, slot text, completed_at),
+    ordered by (booking_date DESC, id DESC) off idx_bookings_trainer_date;
+    pass the last row's (booking_date, id) as ``after`` for the next page.
+    """
+    sql = """
+        SELECT tb.booking_date, tb.id, m.name,
+               s.start_time || '-' || s.end_time || ' (' || s.gender || ')', tb.completed_at
+        FROM trainer_bookings tb
+        LEFT JOIN members m ON m.id = tb.member_id
+        LEFT JOIN slots s ON s.id = tb.slot_id
+        WHERE tb.trainer_id = ?"""
+    params = [trainer_id]
+    if after is not None:
+        sql += " AND (tb.booking_date, tb.id) < (?, ?)"
+        params += list(after)
+    sql += " ORDER BY tb.booking_date DESC, tb.id DESC LIMIT ?"
+    params.append(limit)
+    return connect_db().execute(sql, params).fetchall()
+
+
+# Period keys for utilization: weeks are labelled by their Monday
+_PERIOD_KEYS = {
+    "week": "date({0}, '-6 days', 'weekday 1')",
+    "month": "strftime('%Y-%m', {0})",
+}
+
+
+def _slot_minutes_cte(slot_minutes):
+    """VALUES CTE of slot lengths; slot times are free text, parsed by the caller."""
+    values = ", ".join("(?, ?)" for _ in slot_minutes) or "(NULL, 0)"
+    params = [v for item in slot_minutes.items() for v in item]
+    return f"WITH slot_minutes(slot_id, minutes) AS (VALUES {values})", params
+
+
+def get_trainer_utilization(trainer_id, slot_minutes, period="week", limit=12):
+    """Per-period utilization of a trainer, latest period first.
+
+    ``slot_minutes`` maps slot id to its length in minutes. Rows are
+    (period, sessions, slot-hours, distinct members, cancellations); the
+    period is a week's Monday or a 'YYYY-MM' month, future ones included.
+    """
+    key = _PERIOD_KEYS[period]
+    cte, params = _slot_minutes_cte(slot_minutes)
+    sql = cte + f""",
+        booked AS (
+            SELECT {key.format('tb.booking_date')} AS period, COUNT(*) AS sessions,
+                   SUM(COALESCE(sm.minutes, 0)) / 60.0 AS hours,
+                   COUNT(DISTINCT tb.member_id) AS members
+            FROM trainer_bookings tb
+            LEFT JOIN slot_minutes sm ON sm.slot_id = tb.slot_id
+            WHERE tb.trainer_id = ?
+            GROUP BY 1
+        ),
+        cancelled AS (
+            SELECT {key.format('booking_date')} AS period, COUNT(*) AS cancellations
+            FROM booking_cancellations
+            WHERE trainer_id = ?
+            GROUP BY 1
+        )
+        SELECT period, SUM(sessions), SUM(hours), SUM(members), SUM(cancellations)
+        FROM (
+            SELECT period, sessions, hours, members, 0 AS cancellations FROM booked
+            UNION ALL
+            SELECT period, 0, 0, 0, cancellations FROM cancelled
+        )
+        GROUP BY period
+        ORDER BY period DESC
+        LIMIT ?
+    """
+    return connect_db().execute(sql, params + [trainer_id, trainer_id, limit]).fetchall()
+
+
+def get_trainer_totals(trainer_id, slot_minutes):
+    """(sessions, upcoming, slot-hours, distinct members, cancellations) over all time."""
+    cte, params = _slot_minutes_cte(slot_minutes)
+    sql = cte + """
+        SELECT COUNT(*),
+               COUNT(CASE WHEN tb.booking_date >= date('now', 'localtime') AND tb.completed_at IS NULL THEN 1 END),
+               COALESCE(SUM(sm.minutes), 0) / 60.0,
+               COUNT(DISTINCT tb.member_id),
+               (SELECT COUNT(*) FROM booking_cancellations WHERE trainer_id = ?)
+        FROM trainer_bookings tb
+        LEFT JOIN slot_minutes sm ON sm.slot_id = tb.slot_id
+        WHERE tb.trainer_id = ?
+    """
+    return connect_db().execute(sql, params + [trainer_id, trainer_id]).fetchone()
+
+
+def cancel_booking(booking_id):
+    """Log a booking in booking_cancellations and delete it; True if it existed.
+
+    Runs on the calling thread's connection, so inside a caller's
+    ``with transaction()`` block it is part of that transaction.
+    """
+    conn = connect_db()
+    conn.execute("""
+        INSERT INTO booking_cancellations (booking_id, trainer_id, member_id, slot_id, booking_date)
+        SELECT id, trainer_id, member_id, slot_id, booking_date FROM trainer_bookings WHERE id = ?
+    """, (booking_id,))
+    return conn.execute("DELETE FROM trainer_bookings WHERE id = ?", (booking_id,)).rowcount > 0
+
+
+def complete_sessions(trainer_id, booking_date, slot_ids):
+    """Mark a trainer's open sessions in ``slot_ids`` on ``booking_date`` completed.
+
+    The bookings stay for the history and utilization figures. Returns the
+    number marked; runs in the caller's transaction like cancel_booking.
+    """
+    if not slot_ids:
+        return 0
+    marks = ", ".join("?" for _ in slot_ids)
+    return connect_db().execute(f"""
+        UPDATE trainer_bookings SET completed_at = datetime('now', 'localtime')
+        WHERE trainer_id = ? AND booking_date = ? AND completed_at IS NULL AND slot_id IN ({marks})
+    """, [trainer_id, booking_date, *slot_ids]).rowcount
+
+
 # Delete member by ID
 def delete_member_by_id(member_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM members WHERE id=?", (member_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM members WHERE id=?", (member_id,))
 
 
 if __name__ == "__main__":
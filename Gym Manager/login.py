@@ -46,7 +46,6 @@ class LoginWindow(QDialog):
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE username=? AND password=?", (username, hashed_pw))
         user = cursor.fetchone()
-        conn.close()
 
         if user:
             # Successful login
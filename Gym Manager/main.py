@@ -4,17 +4,49 @@ from PyQt5.QtWidgets import (
     QVBoxLayout, QSplitter, QPushButton, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
-from member_table import MemberTable
-from photo_tab import PhotoTab
+# Tab modules are imported by the tab builders below, on first show, so
+# their imports (reportlab for the Reports tab, ...) stay off the startup path.
 from dashboard import DashboardWidget
-from payments_tab import PaymentsTab
-from attendance_tab import AttendanceTab
-from reports_tab import ReportsTab
-from slots_tab import SlotsTab
 from login import LoginWindow
-from trainer_tab import TrainerTab
+from db import initialize_db, close_db
+
+
+class LazyTab(QWidget):
+    """Tab page that builds its real content the first time it is shown.
+
+    ``factory()`` returns the content widget. The placeholder is painted
+    first and the build runs on the next event loop pass, so switching to
+    a new tab (or opening the window) never waits on its queries.
+    """
+    built = pyqtSignal(QWidget)
+
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+        self.content = None
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._placeholder = QLabel("Loading...")
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self._placeholder)
+        self.setLayout(layout)
+
+    def ensure_built(self):
+        if self.content is None:
+            self.content = self._factory()
+            self.layout().removeWidget(self._placeholder)
+            self._placeholder.deleteLater()
+            self.layout().addWidget(self.content)
+            self.built.emit(self.content)
+        return self.content
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.content is None:
+            QTimer.singleShot(0, self.ensure_built)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -60,55 +92,94 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(top_bar)
 
-        # 🔹 Tabs
-        tabs = QTabWidget()
+        # 🔹 Tabs (each built on first show; attributes stay None until then)
+        self.member_table = self.photo_widget = None
+        self.payments_tab = self.attendance_tab = self.reports_tab = None
+        self.slots_tab = self.trainers_tab = None
+
+        self.tabs = QTabWidget()
+        for title, factory in [
+            ("Members", self._build_members_tab),
+            ("Payments", self._build_payments_tab),
+            ("Attendance", self._build_attendance_tab),
+            ("Reports", self._build_reports_tab),
+            ("Slots", self._build_slots_tab),
+            ("Trainers", self._build_trainers_tab),
+        ]:
+            self.tabs.addTab(LazyTab(factory), title)
+
+        # Add tabs to layout
+        main_layout.addWidget(self.tabs)
 
+        # Final setup
+        main_widget.setLayout(main_layout)
+        self.setCentralWidget(main_widget)
+
+    # --- Tab builders -----------------------------------------------------------
+    def _build_members_tab(self):
         # Members tab (table + photo)
+        from member_table import MemberTable
+        from photo_tab import PhotoTab
         splitter = QSplitter()
         self.member_table = MemberTable()
         self.photo_widget = PhotoTab()
         splitter.addWidget(self.member_table)
         splitter.addWidget(self.photo_widget)
-        tabs.addTab(splitter, "Members")
+        return splitter
 
-        # Payments tab
+    def _build_payments_tab(self):
+        from payments_tab import PaymentsTab
         self.payments_tab = PaymentsTab()
-        tabs.addTab(self.payments_tab, "Payments")
+        return self.payments_tab
 
-        # Attendance tab
+    def _build_attendance_tab(self):
+        from attendance_tab import AttendanceTab
         self.attendance_tab = AttendanceTab()
-        tabs.addTab(self.attendance_tab, "Attendance")
+        return self.attendance_tab
 
-        # Reports tab
+    def _build_reports_tab(self):
+        from reports_tab import ReportsTab
         self.reports_tab = ReportsTab()
-        tabs.addTab(self.reports_tab, "Reports")
+        return self.reports_tab
 
-        # Slots tab
+    def _build_slots_tab(self):
+        from slots_tab import SlotsTab
         self.slots_tab = SlotsTab()
-        tabs.addTab(self.slots_tab, "Slots")
+        return self.slots_tab
 
-        # Trainer tab
+    def _build_trainers_tab(self):
+        from trainer_tab import TrainerTab
         self.trainers_tab = TrainerTab()
-        tabs.addTab(self.trainers_tab, "Trainers")
-
-        # Add tabs to layout
-        main_layout.addWidget(tabs)
-
-        # Final setup
-        main_widget.setLayout(main_layout)
-        self.setCentralWidget(main_widget)
+        return self.trainers_tab
 
     def logout(self):
-        """Close main window and show login dialog again."""
-        self.close()
+        """Hide the window, ask for a login and bring the same window back.
+
+        Built tabs, their loaded rows and the caches are kept (the change hub
+        keeps them current); only what the signed-out user typed or left
+        unsaved is cleared. Cancelling the login closes the app as before.
+        """
+        self.hide()
+        self.clear_session()
         login_window = LoginWindow()
         if login_window.exec_() == QDialog.Accepted:
-            self.__init__()  # Reinitialize main window
             self.show()
+        else:
+            self.close()
+
+    def clear_session(self):
+        """Drop the previous user's input from the tabs built so far."""
+        for tab in (self.member_table, self.payments_tab, self.attendance_tab,
+                    self.slots_tab, self.trainers_tab):
+            if tab is not None:
+                tab.clear_session()
+        self.tabs.setCurrentIndex(0)
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_db)
+    initialize_db()  # upgrades an existing gym.db in place
 
     # Show login first
     login_window = LoginWindow()
@@ -1,4 +1,3 @@
-import sqlite3
 import os
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QPushButton,
@@ -7,7 +6,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QDate
 from PyQt5.QtGui import QPixmap
 
-DB_NAME = "gym.db"
+from db import transaction
 
 class MemberForm(QWidget):
     def __init__(self, refresh_callback=None, member_data=None):
@@ -81,41 +80,40 @@ class MemberForm(QWidget):
 
     def save_member(self):
         """Insert new member and their first payment"""
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         try:
-            # Insert member
-            cursor.execute("""
-                INSERT INTO members (name, phone, email, address, start_date, end_date, membership_plan, gender, photo)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                self.name_input.text(),
-                self.phone_input.text(),
-                self.email_input.text(),
-                self.address_input.text(),
-                self.start_date_input.date().toString("yyyy-MM-dd"),
-                self.end_date_input.date().toString("yyyy-MM-dd"),
-                self.plan_input.currentText(),
-                self.gender_input.currentText(),
-                self.photo_path  # Save photo path
-            ))
-
-            member_id = cursor.lastrowid
-
-            # Insert first payment if entered
-            if self.amount_input.text().strip():
+            with transaction() as conn:
+                cursor = conn.cursor()
+
+                # Insert member
                 cursor.execute("""
-                    INSERT INTO payments (member_id, amount, paid_date, due_date)
-                    VALUES (?, ?, ?, ?)
+                    INSERT INTO members (name, phone, email, address, start_date, end_date, membership_plan, gender, photo)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
-                    member_id,
-                    float(self.amount_input.text()),
+                    self.name_input.text(),
+                    self.phone_input.text(),
+                    self.email_input.text(),
+                    self.address_input.text(),
                     self.start_date_input.date().toString("yyyy-MM-dd"),
-                    self.due_date_input.date().toString("yyyy-MM-dd")
+                    self.end_date_input.date().toString("yyyy-MM-dd"),
+                    self.plan_input.currentText(),
+                    self.gender_input.currentText(),
+                    self.photo_path  # Save photo path
                 ))
 
-            conn.commit()
+                member_id = cursor.lastrowid
+
+                # Insert first payment if entered
+                if self.amount_input.text().strip():
+                    cursor.execute("""
+                        INSERT INTO payments (member_id, amount, paid_date, due_date)
+                        VALUES (?, ?, ?, ?)
+                    """, (
+                        member_id,
+                        float(self.amount_input.text()),
+                        self.start_date_input.date().toString("yyyy-MM-dd"),
+                        self.due_date_input.date().toString("yyyy-MM-dd")
+                    ))
+
             QMessageBox.information(self, "Success", "Member added successfully with payment record!")
 
             # Clear form
@@ -134,5 +132,3 @@ class MemberForm(QWidget):
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add member: {e}")
-        finally:
-            conn.close()
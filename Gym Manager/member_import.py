@@ -0,0 +1,189 @@
+# member_import.py
+"""Bulk member import from CSV.
+
+Rows are streamed from the file, validated one at a time and written in
+chunks: each chunk inserts its members and opening payments with
+executemany inside a single transaction. Rows that fail validation are
+written to a rejects CSV with the line number and reason.
+
+Expected header (extra columns are ignored):
+    name, phone, email, address, gender, start_date, end_date,
+    membership_plan, photo, amount, paid_date, due_date
+Only name, gender, start_date and end_date are required. paid_date
+defaults to start_date when an amount is given.
+"""
+import csv
+import os
+from collections import namedtuple
+from datetime import datetime
+from time import perf_counter
+
+from db import connect_db, to_cents, to_day, transaction
+
+GENDERS = ("Male", "Female", "Other")
+DATE_FORMAT = "%Y-%m-%d"
+CHUNK_SIZE = 2000
+
+# Per-row FTS maintenance is several times slower than indexing a chunk in one
+# INSERT ... SELECT, so this trigger is paused inside each chunk transaction
+# with a row in search_index_paused (see migration v13).
+FTS_INSERT_TRIGGER = "members_fts_ai"
+
+ImportResult = namedtuple("ImportResult", "imported payments rejected seconds")
+
+
+def rejects_path_for(path):
+    """Default location of the rejects file for an import of ``path``."""
+    return path.rsplit(".", 1)[0] + ".rejects.csv"
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a CSV file without loading it."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+
+
+def _date(row, field, required=True):
+    value = row.get(field, "")
+    if not value:
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).strftime(DATE_FORMAT)
+    except ValueError:
+        raise ValueError(f"{field} must be YYYY-MM-DD, got {value!r}")
+
+
+def validate_row(row):
+    """Return (member values, payment values or None); raise ValueError if invalid.
+
+    Payment values lack member_id, which is assigned at insert time.
+    """
+    name = row.get("name", "")
+    if not name:
+        raise ValueError("name is required")
+
+    gender = row.get("gender", "").capitalize()
+    if gender not in GENDERS:
+        raise ValueError(f"gender must be one of {', '.join(GENDERS)}")
+
+    start = _date(row, "start_date")
+    end = _date(row, "end_date")
+    if end < start:
+        raise ValueError("end_date is before start_date")
+
+    member = (
+        name, row.get("phone", ""), row.get("email", ""), row.get("address", ""),
+        start, end, row.get("membership_plan", ""), gender, row.get("photo") or None,
+    )
+
+    payment = None
+    if row.get("amount"):
+        try:
+            amount = float(row["amount"])
+        except ValueError:
+            raise ValueError(f"amount must be a number, got {row['amount']!r}")
+        if amount < 0:
+            raise ValueError("amount cannot be negative")
+        paid = _date(row, "paid_date", required=False) or start
+        due = _date(row, "due_date", required=False)
+        payment = (amount, paid, due)
+
+    return member, payment
+
+
+def _write_chunk(conn, members, payments):
+    """Insert one chunk atomically; returns number of payments written."""
+    with transaction(immediate=True):
+        # Ids are assigned here so payments can reference them without a
+        # round trip per member; the write lock keeps them from being taken.
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name='members'), 0),
+                       COALESCE((SELECT MAX(id) FROM members), 0))
+        """)
+        base = cur.fetchone()[0]
+
+        indexed = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (FTS_INSERT_TRIGGER,)
+        ).fetchone()
+        if indexed:
+            cur.execute("INSERT OR IGNORE INTO search_index_paused VALUES (1)")
+
+        cur.executemany("""
+            INSERT INTO members (id, name, phone, email, address, start_date, end_date, membership_plan, gender, photo)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(base + i + 1,) + m for i, m in enumerate(members)])
+
+        if indexed:
+            cur.execute("""
+                INSERT INTO members_fts (rowid, name, phone, email)
+                SELECT id, name, phone, email FROM members WHERE id > ?
+            """, (base,))
+            cur.execute("DELETE FROM search_index_paused")
+        pay_rows = [(base + i + 1, to_cents(amount), to_day(paid), to_day(due))
+                    for i, (amount, paid, due) in payments]
+        cur.executemany("""
+            INSERT INTO payment_entries (member_id, amount_cents, paid_day, due_day)
+            VALUES (?, ?, ?, ?)
+        """, pay_rows)
+    return len(pay_rows)
+
+
+def import_members(path, rejects_path=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Import members (and opening payments) from ``path``.
+
+    ``progress(rows_read, imported, rejected)`` is called after every chunk.
+    Rejected rows go to ``rejects_path`` (default: <path>.rejects.csv), which
+    is only created when a row is rejected.
+    """
+    rejects_path = rejects_path or rejects_path_for(path)
+    conn = connect_db()
+    t0 = perf_counter()
+    imported = paid = rejected = read = 0
+    members, payments = [], []
+
+    # Opened on the first rejected row; a clean import leaves no rejects file
+    # (and none from an earlier run of the same file)
+    if os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    rejects_file = rejects = None
+    try:
+        for line_no, row in read_rows(path):
+            read += 1
+            try:
+                member, payment = validate_row(row)
+            except ValueError as e:
+                if rejects is None:
+                    rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                    rejects = csv.DictWriter(rejects_file, fieldnames=["line", "error"] + list(row),
+                                             extrasaction="ignore")
+                    rejects.writeheader()
+                rejects.writerow(dict(row, line=line_no, error=str(e)))
+                rejected += 1
+                continue
+
+            if payment:
+                payments.append((len(members), payment))
+            members.append(member)
+
+            if len(members) >= chunk_size:
+                paid += _write_chunk(conn, members, payments)
+                imported += len(members)
+                members, payments = [], []
+                if progress:
+                    progress(read, imported, rejected)
+
+        if members:
+            paid += _write_chunk(conn, members, payments)
+            imported += len(members)
+        if progress:
+            progress(read, imported, rejected)
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+
+    return ImportResult(imported, paid, rejected, perf_counter() - t0)
@@ -0,0 +1,200 @@
+# member_model.py
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+from db import get_member_row, get_members_page, MEMBER_PAGE_SIZE
+from thumbnail_cache import shared_thumbnail_cache
+
+HEADERS = [
+    "ID", "Name", "Phone", "Email", "Gender", "Plan",
+    "Start", "End", "Photo", "Trainer", "Slot",
+    "Edit", "Delete", "Cancel Booking"
+]
+
+# Column index -> label drawn as a button by ButtonDelegate
+ACTION_COLUMNS = {11: "Edit", 12: "Delete", 13: "Cancel Booking"}
+
+EXPIRED_COLOR = QColor(255, 150, 150)   # red
+EXPIRING_COLOR = QColor(255, 255, 150)  # yellow
+
+
+class MemberTableModel(QAbstractTableModel):
+    """Members list backed by keyset-paged queries on members.id.
+
+    Only the raw DB tuples are kept; display text, colours and photo icons
+    are produced in data() for the rows the view actually paints. Photo
+    thumbnails are decoded in the background and fill in as they arrive.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._photo_rows = defaultdict(list)   # photo path -> row numbers
+        self._thumbs = shared_thumbnail_cache()
+        self._thumbs.ready.connect(self._thumbnail_ready)
+        self._filters = ("All", "All", "")
+        self._exhausted = True
+        self._today = datetime.today().date()
+
+    # --- Loading ---------------------------------------------------------------
+    def set_filters(self, plan="All", status="All", search=""):
+        """Drop loaded rows and start paging again with new filters."""
+        filters = (plan, status, search)
+        self.reset_with(filters, get_members_page(*filters, limit=MEMBER_PAGE_SIZE))
+
+    def reset_with(self, filters, first_page):
+        """Replace the contents with an already-fetched first page.
+
+        Used when the first page was queried off the GUI thread; later pages
+        continue from its last id with the same filters.
+        """
+        self.beginResetModel()
+        self._filters = tuple(filters)
+        self._rows = list(first_page)
+        self._photo_rows = defaultdict(list)
+        self._index_photos(0)
+        self._exhausted = len(self._rows) < MEMBER_PAGE_SIZE
+        self._today = datetime.today().date()
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after_id = self._rows[-1][0] if self._rows else 0
+        page = get_members_page(*self._filters, after_id=after_id, limit=MEMBER_PAGE_SIZE)
+        if len(page) < MEMBER_PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self._index_photos(first)
+        self.endInsertRows()
+
+    def patch_members(self, member_ids):
+        """Re-read just these members and update, insert or drop their rows.
+
+        Rows are kept in id order, so each member is found by bisect. One
+        that belongs past the last loaded page is left for fetchMore.
+        """
+        for member_id in sorted(member_ids):
+            pos = bisect_left(self._rows, (member_id,))
+            loaded = pos < len(self._rows) and self._rows[pos][0] == member_id
+            if not loaded and pos == len(self._rows) and not self._exhausted:
+                continue
+            row = get_member_row(member_id, *self._filters)
+            if loaded and row is not None:
+                self._rows[pos] = row
+                self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(HEADERS) - 1))
+            elif loaded:
+                self.beginRemoveRows(QModelIndex(), pos, pos)
+                del self._rows[pos]
+                self.endRemoveRows()
+            elif row is not None:
+                self.beginInsertRows(QModelIndex(), pos, pos)
+                self._rows.insert(pos, row)
+                self.endInsertRows()
+        # Row numbers after an insert or removal have shifted
+        self._photo_rows = defaultdict(list)
+        self._index_photos(0)
+
+    def member_row(self, row):
+        """Raw get_members tuple for a view row."""
+        return self._rows[row]
+
+    # --- Qt model API ----------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            return self._display(row, col)
+        if role == Qt.DecorationRole and col == 8:
+            return self._photo_icon(row)
+        if role == Qt.BackgroundRole and col not in ACTION_COLUMNS:
+            days_left = self._days_left(row)
+            if days_left is not None and days_left < 0:
+                return EXPIRED_COLOR
+            if days_left is not None and days_left <= 7:
+                return EXPIRING_COLOR
+        return None
+
+    # --- Helpers ---------------------------------------------------------------
+    def _display(self, row, col):
+        (member_id, name, phone, email, gender, address, start, end, plan, photo,
+         trainer_name, slot_info, booking_date) = row
+
+        if col in ACTION_COLUMNS:
+            return ACTION_COLUMNS[col]
+        if col == 7:
+            days_left = self._days_left(row)
+            if days_left is not None and days_left < 0:
+                return f"{end} ❌ Expired"
+            if days_left is not None and days_left <= 7:
+                return f"{end} ⚠️ {days_left} days left"
+            return end
+        if col == 8:
+            return "No Photo" if not photo or self._thumbs.is_missing(photo) else ""
+        if col == 10:
+            return f"{slot_info} on {booking_date}" if booking_date else ""
+        return [str(member_id), name, phone, email, gender, plan, start, end, None, trainer_name][col]
+
+    def _days_left(self, row):
+        end = row[7]
+        if not end:
+            return None
+        try:
+            return (datetime.strptime(end, "%Y-%m-%d").date() - self._today).days
+        except ValueError:
+            return None
+
+    def _photo_icon(self, row):
+        photo = row[9]
+        return self._thumbs.icon(photo) if photo else None
+
+    def _index_photos(self, start):
+        for i in range(start, len(self._rows)):
+            photo = self._rows[i][9]
+            if photo:
+                self._photo_rows[photo].append(i)
+
+    def _thumbnail_ready(self, path):
+        for i in self._photo_rows.get(path, ()):
+            index = self.index(i, 8)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole, Qt.DisplayRole])
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paint a cell's text as a push button without creating a widget per row."""
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = index.data(Qt.DisplayRole)
+        button.state = QStyle.State_Enabled
+        QApplication.style().drawControl(QStyle.CE_PushButton, button, painter)
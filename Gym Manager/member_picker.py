@@ -0,0 +1,125 @@
+# member_picker.py
+"""Type-ahead member selection for forms and dialogs.
+
+MemberPicker replaces roster-sized QComboBoxes: nothing is loaded when it
+is created, and each pause in typing runs one db.find_members lookup of at
+most MEMBER_PICKER_LIMIT rows whose results are offered in a completer
+popup.
+"""
+from PyQt5.QtCore import Qt, QModelIndex, QTimer, pyqtSignal
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
+from PyQt5.QtWidgets import QCompleter, QLineEdit
+
+from db import find_members, MEMBER_PICKER_LIMIT
+
+LOOKUP_DEBOUNCE_MS = 150
+
+
+def member_label(row):
+    member_id, name, gender, phone, _ = row
+    label = f"{name} ({gender}) - ID:{member_id}"
+    return f"{label} - {phone}" if phone else label
+
+
+class MemberPicker(QLineEdit):
+    """Line edit that looks members up as you type.
+
+    ``member()`` is the chosen (id, name, gender, phone, end_date) row, or
+    None until a suggestion is picked; editing the text clears it again.
+    ``memberChanged`` carries the new member id or None.
+    """
+    memberChanged = pyqtSignal(object)
+
+    def __init__(self, parent=None, active_only=False, limit=MEMBER_PICKER_LIMIT,
+                 placeholder="Type a name, phone, email or ID..."):
+        super().__init__(parent)
+        self.active_only = active_only
+        self.limit = limit
+        self._member = None
+        self._rows = []
+        self.setPlaceholderText(placeholder)
+        self.setClearButtonEnabled(True)
+
+        self._model = QStandardItemModel(self)
+        self._completer = QCompleter(self._model, self)
+        # Results are already filtered by SQL; show them as returned
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self._completer.setMaxVisibleItems(limit)
+        # Attached with setWidget (not setCompleter) so QLineEdit does not pop
+        # up the previous results before the new lookup has run
+        self._completer.setWidget(self)
+        self._completer.activated[QModelIndex].connect(self._chosen)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(LOOKUP_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._lookup)
+        self.textEdited.connect(self._edited)
+        self.returnPressed.connect(self._accept_single)
+
+    def member(self):
+        return self._member
+
+    def member_id(self):
+        return self._member[0] if self._member else None
+
+    def set_member(self, row):
+        """Show ``row`` (as returned by find_members) as the chosen member."""
+        self._timer.stop()
+        self.setText(member_label(row))
+        self._set_member(row)
+
+    def clear_member(self):
+        self._timer.stop()
+        self.clear()
+        self._set_member(None)
+
+    def _set_member(self, row):
+        changed = (row[0] if row else None) != self.member_id()
+        self._member = row
+        if changed:
+            self.memberChanged.emit(self.member_id())
+
+    def _edited(self, text):
+        self._set_member(None)
+        if text.strip():
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self._completer.popup().hide()
+
+    def _lookup(self):
+        try:
+            self._rows = find_members(self.text(), self.limit, self.active_only)
+        except Exception as e:
+            print("Member lookup failed:", e)
+            self._rows = []
+
+        self._model.clear()
+        for i, row in enumerate(self._rows):
+            item = QStandardItem(member_label(row))
+            item.setData(i, Qt.UserRole)
+            self._model.appendRow(item)
+
+        if self._rows and self.hasFocus():
+            self._completer.complete()
+        else:
+            self._completer.popup().hide()
+
+    def _chosen(self, index):
+        row = self._rows[index.data(Qt.UserRole)]
+        self.setText(member_label(row))
+        self._set_member(row)
+
+    def _accept_single(self):
+        """Enter picks the only suggestion when exactly one member matches."""
+        if self._member is not None:
+            return
+        if self._timer.isActive():
+            self._timer.stop()
+            self._lookup()
+        if len(self._rows) == 1:
+            self._completer.popup().hide()
+            self.setText(member_label(self._rows[0]))
+            self._set_member(self._rows[0])
@@ -1,24 +1,29 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QHBoxLayout, QComboBox, QMessageBox, QDialog, QLabel, QLineEdit
+    QWidget, QVBoxLayout, QTableView, QAbstractItemView,
+    QPushButton, QHBoxLayout, QComboBox, QMessageBox, QDialog, QLabel, QLineEdit,
+    QFileDialog, QProgressDialog
 )
-from PyQt5.QtGui import QPixmap, QIcon, QColor
-from PyQt5.QtCore import Qt
-import os
+from PyQt5.QtCore import Qt, QTimer, QThreadPool
 from datetime import datetime
-import sqlite3
 
 # ✅ Import DB helper functions
-from db import get_members, delete_member_by_id
+from db import cancel_booking, delete_member_by_id, get_members_page, transaction, MEMBER_PAGE_SIZE
+from change_hub import shared_change_hub, changes_to
 from member_form import MemberForm
+from member_model import MemberTableModel, ButtonDelegate, ACTION_COLUMNS
+from member_import import import_members, rejects_path_for
+from workers import Task, single_thread_pool
 
-DB_NAME = "gym.db"
+# Wait this long after the last keystroke before searching
+SEARCH_DEBOUNCE_MS = 250
 
 
 class MemberTable(QWidget):
     def __init__(self):
         super().__init__()
         self.refresh_callback = self.load_members
+        self._search_pool = single_thread_pool(self)
+        self._search_generation = 0
         self.init_ui()
 
     def init_ui(self):
@@ -29,7 +34,11 @@ class MemberTable(QWidget):
 
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search by name, phone or email...")
-        self.search_bar.textChanged.connect(self.load_members)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.load_members)
+        self.search_bar.textChanged.connect(self._search_timer.start)
 
         self.filter_box = QComboBox()
         self.filter_box.addItems(["All", "Basic", "Premium", "VIP"])
@@ -42,143 +51,102 @@ class MemberTable(QWidget):
         add_btn = QPushButton("Add Member")
         add_btn.clicked.connect(self.open_add_form)
 
+        import_btn = QPushButton("Import CSV")
+        import_btn.clicked.connect(self.import_csv)
+
         top_bar.addWidget(self.search_bar)
         top_bar.addWidget(self.filter_box)
         top_bar.addWidget(self.status_box)
         top_bar.addStretch()
+        top_bar.addWidget(import_btn)
         top_bar.addWidget(add_btn)
 
-        # 📋 Members table
-        self.table = QTableWidget()
-        self.table.setColumnCount(14)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Name", "Phone", "Email", "Gender", "Plan",
-            "Start", "End", "Photo", "Trainer", "Slot",
-            "Edit", "Delete", "Cancel Booking"
-        ])
+        # 📋 Members table (rows are paged in from the DB as the view scrolls)
+        self.model = MemberTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setColumnHidden(0, True)  # Hide ID
-        self.table.setSortingEnabled(True)
-        self.table.cellDoubleClicked.connect(self.show_member_details)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setDefaultSectionSize(54)
+        self.button_delegate = ButtonDelegate(self.table)
+        for col in ACTION_COLUMNS:
+            self.table.setItemDelegateForColumn(col, self.button_delegate)
+        self.table.clicked.connect(self.on_cell_clicked)
+        self.table.doubleClicked.connect(self.show_member_details)
 
         layout.addLayout(top_bar)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
         self.load_members()
+        shared_change_hub().changed.connect(self.apply_changes)
 
     def load_members(self):
-        """Load members with filters and search applied."""
+        """Load members with filters and search applied.
+
+        The first page is queried on a worker thread; a newer request
+        supersedes any still queued or running, whose result is dropped.
+        """
+        self._search_timer.stop()
         selected_plan = self.filter_box.currentText()
         selected_status = self.status_box.currentText()
         search_text = self.search_bar.text().lower()
-
-        rows = get_members(plan=selected_plan, status=selected_status, search=search_text)
-        self.populate_table(rows)
-
-    def populate_table(self, rows):
-        self.table.setRowCount(0)
-
-        for row_index, row in enumerate(rows):
-            self.table.insertRow(row_index)
-            member_id, name, phone, email, gender, address, start, end, plan, photo = row
-
-            self.table.setItem(row_index, 0, QTableWidgetItem(str(member_id)))
-            self.table.setItem(row_index, 1, QTableWidgetItem(name))
-            self.table.setItem(row_index, 2, QTableWidgetItem(phone))
-            self.table.setItem(row_index, 3, QTableWidgetItem(email))
-            self.table.setItem(row_index, 4, QTableWidgetItem(gender))
-            self.table.setItem(row_index, 5, QTableWidgetItem(plan))
-            self.table.setItem(row_index, 6, QTableWidgetItem(start))
-            self.table.setItem(row_index, 7, QTableWidgetItem(end))
-
-            # 🖼 Photo thumbnail
-            photo_item = QTableWidgetItem()
-            if photo and os.path.exists(photo):
-                icon = QIcon(QPixmap(photo).scaled(50, 50, Qt.KeepAspectRatio))
-                photo_item.setIcon(icon)
-            else:
-                photo_item.setText("No Photo")
-            self.table.setItem(row_index, 8, photo_item)
-
-            # Fetch trainer and slot info
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT t.name, s.start_time || '-' || s.end_time || ' (' || s.gender || ')', tb.booking_date
-                FROM trainer_bookings tb
-                JOIN trainers t ON tb.trainer_id = t.id
-                JOIN slots s ON tb.slot_id = s.id
-                WHERE tb.member_id=? AND tb.booking_date>=date('now')
-                ORDER BY tb.booking_date LIMIT 1
-            """, (member_id,))
-            booking = cursor.fetchone()
-            conn.close()
-
-            trainer_name, slot_info = ("", "")
-            if booking:
-                trainer_name, slot_info, booking_date = booking
-                slot_info += f" on {booking_date}"
-
-            self.table.setItem(row_index, 9, QTableWidgetItem(trainer_name))
-            self.table.setItem(row_index, 10, QTableWidgetItem(slot_info))
-
-            # ✏️ Edit button
-            edit_btn = QPushButton("Edit")
-            edit_btn.clicked.connect(lambda checked, r=row: self.open_edit_form(r))
-            self.table.setCellWidget(row_index, 11, edit_btn)
-
-            # ❌ Delete button
-            del_btn = QPushButton("Delete")
-            del_btn.clicked.connect(lambda checked, id=member_id: self.delete_member(id))
-            self.table.setCellWidget(row_index, 12, del_btn)
-
-            # 🟢 Cancel Booking button
-            cancel_btn = QPushButton("Cancel Booking")
-            cancel_btn.clicked.connect(lambda checked, m_id=member_id: self.cancel_booking(m_id))
-            self.table.setCellWidget(row_index, 13, cancel_btn)
-
-            # ⚠️ Expiry highlight
-            try:
-                if end:
-                    end_date = datetime.strptime(end, "%Y-%m-%d").date()
-                    today = datetime.today().date()
-                    days_left = (end_date - today).days
-
-                    if end_date < today:
-                        for col in range(14):
-                            item = self.table.item(row_index, col)
-                            if item:
-                                item.setBackground(QColor(255, 150, 150))  # red
-                        self.table.setItem(row_index, 7, QTableWidgetItem(f"{end} ❌ Expired"))
-
-                    elif days_left <= 7:
-                        for col in range(14):
-                            item = self.table.item(row_index, col)
-                            if item:
-                                item.setBackground(QColor(255, 255, 150))  # yellow
-                        self.table.setItem(row_index, 7, QTableWidgetItem(f"{end} ⚠️ {days_left} days left"))
-            except Exception:
-                print("Date parse error")
-
+        filters = (selected_plan, selected_status, search_text)
+
+        self._search_generation += 1
+        self._search_pool.clear()
+        task = Task((self._search_generation, filters), get_members_page, *filters)
+        task.signals.finished.connect(self._apply_search)
+        task.signals.failed.connect(self._search_failed)
+        self._search_pool.start(task)
+
+    def _apply_search(self, tag, rows):
+        generation, filters = tag
+        if generation != self._search_generation:
+            return  # a newer search is on its way
+        self.model.reset_with(filters, rows)
         self.table.resizeColumnsToContents()
 
-    def show_member_details(self, row, column):
+    def _search_failed(self, tag, error):
+        if tag[0] == self._search_generation:
+            print("Member search failed:", error)
+
+    def apply_changes(self, changes):
+        """Patch the rows of members whose record or next booking changed."""
+        member_ids = {c.row_id for c in changes_to(changes, "members")}
+        for change in changes_to(changes, "trainer_bookings"):
+            member_ids.update(m for m in (change.old, change.new) if m is not None)
+        if len(member_ids) > MEMBER_PAGE_SIZE:
+            self.load_members()   # e.g. an import chunk: paging in again is cheaper
+        elif member_ids:
+            self.model.patch_members(member_ids)
+
+    def on_cell_clicked(self, index):
+        """Dispatch clicks on the Edit / Delete / Cancel Booking columns."""
+        if index.column() not in ACTION_COLUMNS:
+            return
+        row = self.model.member_row(index.row())
+        member_id = row[0]
+        if index.column() == 11:
+            self.open_edit_form(row)
+        elif index.column() == 12:
+            self.delete_member(member_id)
+        else:
+            self.cancel_booking(member_id)
+
+    def show_member_details(self, index):
         """Open dialog with full member details."""
-        member_id = self.table.item(row, 0).text()
-
-        # Just reuse the table row data
-        member = [self.table.item(row, col).text() if self.table.item(row, col) else ""
-                  for col in range(8)]
-        member_id, name, phone, email, gender, plan, start, end = member
+        row = self.model.member_row(index.row())
+        member_id, name, phone, email, gender, address, start, end, plan, photo = row[:10]
 
         dialog = QDialog(self)
         dialog.setWindowTitle("Member Details")
         layout = QVBoxLayout()
 
         # Photo
-        photo_item = self.table.item(row, 8)
-        if photo_item and photo_item.icon():
-            pixmap = photo_item.icon().pixmap(200, 200)
+        icon = self.model.index(index.row(), 8).data(Qt.DecorationRole)
+        if icon:
+            pixmap = icon.pixmap(200, 200)
             photo_label = QLabel()
             photo_label.setPixmap(pixmap)
             layout.addWidget(photo_label)
@@ -198,14 +166,59 @@ class MemberTable(QWidget):
         dialog.setLayout(layout)
         dialog.exec_()
 
+    def clear_session(self):
+        """Close an open member form and drop the search on logout."""
+        form = getattr(self, "form", None)
+        if form is not None:
+            form.close()
+            self.form = None
+        if self.search_bar.text():
+            self.search_bar.clear()
+            self.load_members()
+
     def open_add_form(self):
-        self.form = MemberForm(refresh_callback=self.refresh_all)
+        self.form = MemberForm()
         self.form.show()
 
     def open_edit_form(self, member_data):
-        self.form = MemberForm(refresh_callback=self.refresh_all, member_data=member_data)
+        self.form = MemberForm(member_data=member_data)
         self.form.show()
 
+    def import_csv(self):
+        """Bulk-import members from a CSV file on a worker thread."""
+        path, _ = QFileDialog.getOpenFileName(self, "Import Members", "", "CSV Files (*.csv)")
+        if not path:
+            return
+
+        self.import_progress = QProgressDialog("Importing members...", None, 0, 0, self)
+        self.import_progress.setWindowTitle("Import CSV")
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.show()
+
+        task = Task(path, import_members, path, with_progress=True)
+        task.signals.progress.connect(self._import_progress)
+        task.signals.finished.connect(self._import_finished)
+        task.signals.failed.connect(self._import_failed)
+        QThreadPool.globalInstance().start(task)
+
+    def _import_progress(self, path, values):
+        read, imported, rejected = values
+        self.import_progress.setLabelText(
+            f"Read {read} rows: {imported} imported, {rejected} rejected"
+        )
+
+    def _import_finished(self, path, result):
+        self.import_progress.close()
+        message = (f"Imported {result.imported} members and {result.payments} payments "
+                   f"in {result.seconds:.1f}s ({result.imported / max(result.seconds, 1e-9):.0f} rows/s).")
+        if result.rejected:
+            message += f"\n{result.rejected} rows were rejected; see {rejects_path_for(path)}"
+        QMessageBox.information(self, "Import Finished", message)
+
+    def _import_failed(self, path, error):
+        self.import_progress.close()
+        QMessageBox.critical(self, "Error", f"Import failed: {error.splitlines()[-1]}")
+
     def delete_member(self, member_id):
         confirm = QMessageBox.question(
             self, "Confirm Delete", "Are you sure you want to delete this member?",
@@ -213,7 +226,6 @@ class MemberTable(QWidget):
         )
         if confirm == QMessageBox.Yes:
             delete_member_by_id(member_id)
-            self.refresh_all()
 
     def cancel_booking(self, member_id):
         confirm = QMessageBox.question(
@@ -225,30 +237,19 @@ class MemberTable(QWidget):
             return
 
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
             today = datetime.today().strftime("%Y-%m-%d")
-            cursor.execute("SELECT id, trainer_id FROM trainer_bookings WHERE member_id=? AND booking_date=?", (member_id, today))
-            row = cursor.fetchone()
+            with transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id FROM trainer_bookings WHERE member_id=? AND booking_date=? AND completed_at IS NULL",
+                    (member_id, today)
+                )
+                row = cursor.fetchone()
+                if row:
+                    cancel_booking(row[0])
             if row:
-                booking_id, trainer_id = row
-                cursor.execute("DELETE FROM trainer_bookings WHERE id=?", (booking_id,))
-                cursor.execute("UPDATE trainers SET status='Available' WHERE id=?", (trainer_id,))
-                conn.commit()
                 QMessageBox.information(self, "Success", "Today's booking canceled.")
-                self.load_members()
             else:
                 QMessageBox.information(self, "Info", "No booking found for today.")
-            conn.close()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to cancel booking: {e}")
-
-    def refresh_all(self):
-        """Refresh both the table and the dashboard"""
-        self.load_members()
-        try:
-            main_window = self.window()
-            if hasattr(main_window, "dashboard"):
-                main_window.dashboard.refresh()
-        except Exception as e:
-            print("Dashboard refresh failed:", e)
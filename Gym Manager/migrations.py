@@ -0,0 +1,722 @@
+# migrations.py
+"""Schema migrations, applied in order and tracked in PRAGMA user_version.
+
+Each step takes a cursor and runs inside one transaction together with the
+user_version bump, so an interrupted upgrade leaves the file at the last
+completed version. Append new steps to MIGRATIONS; never edit old ones.
+"""
+import re
+import sqlite3
+from time import perf_counter
+
+
+# --- v1: base schema -----------------------------------------------------------
+def base_schema(cur):
+    # Members
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            membership_plan TEXT,
+            gender TEXT CHECK(gender IN ('Male','Female','Other')) NOT NULL,
+            photo TEXT
+        )
+    ''')
+
+    # Payments
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            amount REAL,
+            paid_date TEXT,
+            due_date TEXT,
+            FOREIGN KEY(member_id) REFERENCES members(id)
+        )
+    ''')
+
+    # Attendance
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('Present','Absent')),
+            UNIQUE(member_id, date),
+            FOREIGN KEY(member_id) REFERENCES members(id)
+        )
+    ''')
+
+    # Users
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    ''')
+
+    # Slots
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            gender TEXT CHECK(gender IN ('Male','Female','Mixed')) NOT NULL
+        )
+    ''')
+
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS member_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            slot_id INTEGER NOT NULL,
+            FOREIGN KEY(member_id) REFERENCES members(id),
+            FOREIGN KEY(slot_id) REFERENCES slots(id),
+            UNIQUE(member_id, slot_id)
+        )
+    ''')
+
+    # Trainers
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS trainers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            specialization TEXT,
+            status TEXT CHECK(status IN ('Available','Training')) DEFAULT 'Available'
+        )
+    ''')
+
+    # Trainer Bookings
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS trainer_bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trainer_id INTEGER NOT NULL,
+            member_id INTEGER NOT NULL,
+            slot_id INTEGER NOT NULL,
+            booking_date TEXT NOT NULL,
+            FOREIGN KEY(trainer_id) REFERENCES trainers(id),
+            FOREIGN KEY(member_id) REFERENCES members(id),
+            FOREIGN KEY(slot_id) REFERENCES slots(id),
+            UNIQUE(trainer_id, slot_id, booking_date)
+        )
+    ''')
+
+
+def _columns(cur, table):
+    return [row[1] for row in cur.execute(f"PRAGMA table_info({table})")]
+
+
+def _table_sql(cur, table):
+    row = cur.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    return row[0] if row else ""
+
+
+# --- v2: reconcile tables created by older builds ----------------------------
+def reconcile_legacy_tables(cur):
+    # Early gym.db files were created before members had a gender column
+    if "gender" not in _columns(cur, "members"):
+        cur.execute("ALTER TABLE members ADD COLUMN gender TEXT NOT NULL DEFAULT 'Other'")
+
+    # Slots must accept the 'Mixed' option the Slots tab offers
+    if "'Mixed'" not in _table_sql(cur, "slots"):
+        cur.execute('''
+            CREATE TABLE slots_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                gender TEXT CHECK(gender IN ('Male','Female','Mixed')) NOT NULL
+            )
+        ''')
+        cur.execute('''
+            INSERT INTO slots_new (id, start_time, end_time, gender)
+            SELECT id, start_time, end_time,
+                   CASE WHEN gender IN ('Male','Female') THEN gender ELSE 'Mixed' END
+            FROM slots
+        ''')
+        cur.execute("DROP TABLE slots")
+        cur.execute("ALTER TABLE slots_new RENAME TO slots")
+
+    # Attendance status is one of two values (older files were created
+    # without the CHECK that AttendanceTab used to re-declare)
+    if "CHECK" not in _table_sql(cur, "attendance"):
+        cur.execute('''
+            CREATE TABLE attendance_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('Present','Absent')),
+                UNIQUE(member_id, date),
+                FOREIGN KEY(member_id) REFERENCES members(id)
+            )
+        ''')
+        cur.execute('''
+            INSERT INTO attendance_new (id, member_id, date, status)
+            SELECT id, member_id, date, status FROM attendance
+            WHERE status IN ('Present','Absent')
+        ''')
+        cur.execute("DROP TABLE attendance")
+        cur.execute("ALTER TABLE attendance_new RENAME TO attendance")
+
+
+# --- v3: member full-text search ---------------------------------------------
+def member_search_index(cur):
+    """Trigram FTS5 index over member name/phone/email.
+
+    External-content table over ``members`` kept in sync by triggers and
+    backfilled once from the existing rows. SQLite builds without FTS5 or
+    the trigram tokenizer (< 3.34) skip this; search then falls back to LIKE.
+    """
+    try:
+        cur.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+                name, phone, email,
+                content='members', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print("Member search index unavailable:", e)
+        return
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS members_fts_ai AFTER INSERT ON members BEGIN
+            INSERT INTO members_fts(rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS members_fts_ad AFTER DELETE ON members BEGIN
+            INSERT INTO members_fts(members_fts, rowid, name, phone, email)
+            VALUES ('delete', old.id, old.name, old.phone, old.email);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS members_fts_au AFTER UPDATE OF name, phone, email ON members BEGIN
+            INSERT INTO members_fts(members_fts, rowid, name, phone, email)
+            VALUES ('delete', old.id, old.name, old.phone, old.email);
+            INSERT INTO members_fts(rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END
+    """)
+    cur.execute("INSERT INTO members_fts(members_fts) VALUES ('rebuild')")
+
+
+# --- v4: indexes for the hot report / lookup predicates ------------------------
+def hot_path_indexes(cur):
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_paid_date ON payments(paid_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_member ON payments(member_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_members_end_date ON members(end_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_members_plan ON members(membership_plan)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bookings_member_date ON trainer_bookings(member_id, booking_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date ON trainer_bookings(booking_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)")
+    cur.execute("ANALYZE")
+
+
+# --- v5: membership summary for the dashboard ----------------------------------
+def membership_summary(cur):
+    """Member counts bucketed by end_date, maintained by triggers.
+
+    Members without an end date are kept under the '' bucket. Totals and
+    active/expired splits are sums over this table, which has one row per
+    distinct end date rather than one per member.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS member_expiry_buckets (
+            end_date TEXT PRIMARY KEY,
+            members INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS member_buckets_ai AFTER INSERT ON members BEGIN
+            INSERT INTO member_expiry_buckets (end_date, members)
+            VALUES (COALESCE(new.end_date, ''), 1)
+            ON CONFLICT(end_date) DO UPDATE SET members = members + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS member_buckets_ad AFTER DELETE ON members BEGIN
+            UPDATE member_expiry_buckets SET members = members - 1
+            WHERE end_date = COALESCE(old.end_date, '');
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS member_buckets_au AFTER UPDATE OF end_date ON members
+        WHEN old.end_date IS NOT new.end_date BEGIN
+            UPDATE member_expiry_buckets SET members = members - 1
+            WHERE end_date = COALESCE(old.end_date, '');
+            INSERT INTO member_expiry_buckets (end_date, members)
+            VALUES (COALESCE(new.end_date, ''), 1)
+            ON CONFLICT(end_date) DO UPDATE SET members = members + 1;
+        END
+    """)
+    cur.execute("DELETE FROM member_expiry_buckets")
+    cur.execute("""
+        INSERT INTO member_expiry_buckets (end_date, members)
+        SELECT COALESCE(end_date, ''), COUNT(*) FROM members GROUP BY 1
+    """)
+
+
+# --- v6: presence-only attendance ----------------------------------------------
+def sparse_attendance(cur):
+    """Store only who was present; absence is the lack of a row.
+
+    ``attendance_presence`` is keyed (date, member_id) without a rowid, so a
+    day's marks sit together and a date-range scan touches only present
+    members. ``attendance`` becomes a view with the old member_id/date/status
+    columns (status is always 'Present'), and INSTEAD OF triggers map old
+    style writes onto the new table: inserting 'Absent' removes the mark.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_presence (
+            date TEXT NOT NULL,
+            member_id INTEGER NOT NULL,
+            PRIMARY KEY (date, member_id),
+            FOREIGN KEY(member_id) REFERENCES members(id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        INSERT OR IGNORE INTO attendance_presence (date, member_id)
+        SELECT date, member_id FROM attendance WHERE status = 'Present'
+    """)
+    cur.execute("DROP TABLE attendance")
+
+    cur.execute("""
+        CREATE VIEW attendance AS
+        SELECT member_id, date, 'Present' AS status FROM attendance_presence
+    """)
+    cur.execute("""
+        CREATE TRIGGER attendance_view_insert INSTEAD OF INSERT ON attendance BEGIN
+            INSERT OR IGNORE INTO attendance_presence (date, member_id)
+            SELECT new.date, new.member_id WHERE new.status = 'Present';
+            DELETE FROM attendance_presence
+            WHERE new.status <> 'Present' AND date = new.date AND member_id = new.member_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER attendance_view_delete INSTEAD OF DELETE ON attendance BEGIN
+            DELETE FROM attendance_presence WHERE date = old.date AND member_id = old.member_id;
+        END
+    """)
+
+
+# --- v7: per-member monthly presence bitmaps ---------------------------------------
+def attendance_month_bitmaps(cur):
+    """One row per member per month with bit (day - 1) set for each day present.
+
+    Kept in step with attendance_presence by triggers. The attendance
+    summary reads about a dozen of these per member for a year instead of
+    every visit, and gets present days, last visit and streaks from bit
+    arithmetic.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_months (
+            member_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            mask INTEGER NOT NULL,
+            PRIMARY KEY (month, member_id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_months_ai AFTER INSERT ON attendance_presence BEGIN
+            INSERT INTO attendance_months (member_id, month, mask)
+            VALUES (new.member_id, substr(new.date, 1, 7), 1 << (CAST(substr(new.date, 9, 2) AS INTEGER) - 1))
+            ON CONFLICT(month, member_id) DO UPDATE SET mask = mask | excluded.mask;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_months_ad AFTER DELETE ON attendance_presence BEGIN
+            UPDATE attendance_months
+            SET mask = mask & ~(1 << (CAST(substr(old.date, 9, 2) AS INTEGER) - 1))
+            WHERE member_id = old.member_id AND month = substr(old.date, 1, 7);
+            DELETE FROM attendance_months
+            WHERE member_id = old.member_id AND month = substr(old.date, 1, 7) AND mask = 0;
+        END
+    """)
+    cur.execute("DELETE FROM attendance_months")
+    cur.execute("""
+        INSERT INTO attendance_months (member_id, month, mask)
+        SELECT member_id, substr(date, 1, 7), SUM(1 << (CAST(substr(date, 9, 2) AS INTEGER) - 1))
+        FROM attendance_presence GROUP BY 1, 2
+    """)
+
+
+# --- v8: monthly revenue rollup ----------------------------------------------------
+def revenue_rollup(cur):
+    """Payment totals and counts per paid month, maintained by triggers.
+
+    Payments without a parseable paid_date are left out, as they were by
+    the revenue report. revenue_rollup.py can rebuild or check the table.
+    The paid_date index gains amount so the partial months at the ends of
+    a report range are summed from the index alone.
+    """
+    cur.execute("DROP INDEX IF EXISTS idx_payments_paid_date")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_paid_date_amount ON payments(paid_date, amount)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS revenue_months (
+            month TEXT PRIMARY KEY,
+            total REAL NOT NULL,
+            payments INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS revenue_months_ai AFTER INSERT ON payments
+        WHEN strftime('%Y-%m', new.paid_date) IS NOT NULL BEGIN
+            INSERT INTO revenue_months (month, total, payments)
+            VALUES (strftime('%Y-%m', new.paid_date), COALESCE(new.amount, 0), 1)
+            ON CONFLICT(month) DO UPDATE SET total = total + excluded.total, payments = payments + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS revenue_months_ad AFTER DELETE ON payments
+        WHEN strftime('%Y-%m', old.paid_date) IS NOT NULL BEGIN
+            UPDATE revenue_months SET total = total - COALESCE(old.amount, 0), payments = payments - 1
+            WHERE month = strftime('%Y-%m', old.paid_date);
+            DELETE FROM revenue_months WHERE month = strftime('%Y-%m', old.paid_date) AND payments = 0;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS revenue_months_au AFTER UPDATE OF amount, paid_date ON payments BEGIN
+            UPDATE revenue_months SET total = total - COALESCE(old.amount, 0), payments = payments - 1
+            WHERE month = strftime('%Y-%m', old.paid_date);
+            DELETE FROM revenue_months WHERE month = strftime('%Y-%m', old.paid_date) AND payments = 0;
+            INSERT INTO revenue_months (month, total, payments)
+            SELECT strftime('%Y-%m', new.paid_date), COALESCE(new.amount, 0), 1
+            WHERE strftime('%Y-%m', new.paid_date) IS NOT NULL
+            ON CONFLICT(month) DO UPDATE SET total = total + excluded.total, payments = payments + 1;
+        END
+    """)
+    cur.execute("DELETE FROM revenue_months")
+    cur.execute("""
+        INSERT INTO revenue_months (month, total, payments)
+        SELECT strftime('%Y-%m', paid_date), COALESCE(SUM(amount), 0), COUNT(*)
+        FROM payments WHERE strftime('%Y-%m', paid_date) IS NOT NULL
+        GROUP BY 1
+    """)
+    cur.execute("ANALYZE payments")
+
+
+# --- v9: typed payment storage -----------------------------------------------------
+def typed_payments(cur):
+    """Store payments as epoch days and integer cents.
+
+    ``payment_entries`` keeps paid/due dates as days since 1970-01-01 and
+    the amount in cents, so range filters are plain integer comparisons on
+    an index and revenue sums are exact. ``payments`` becomes a view with
+    the old text-date / float-amount columns; INSTEAD OF triggers convert
+    writes, so existing INSERT/UPDATE/DELETE statements keep working. The
+    revenue rollup moves to the new table and to cents.
+    """
+    to_day = "CAST(julianday({0}) - 2440587.5 AS INTEGER)"
+    to_cents = "CAST(ROUND({0} * 100) AS INTEGER)"
+    month = "strftime('%Y-%m', {0} * 86400, 'unixepoch')"
+
+    unparsed = cur.execute("""
+        SELECT COUNT(*) FROM payments
+        WHERE (paid_date <> '' AND julianday(paid_date) IS NULL)
+           OR (due_date <> '' AND julianday(due_date) IS NULL)
+    """).fetchone()[0]
+    if unparsed:
+        print(f"{unparsed} payment(s) have dates that are not YYYY-MM-DD; they are stored without them")
+
+    cur.execute("""
+        CREATE TABLE payment_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            amount_cents INTEGER,
+            paid_day INTEGER,
+            due_day INTEGER,
+            FOREIGN KEY(member_id) REFERENCES members(id)
+        )
+    """)
+    cur.execute(f"""
+        INSERT INTO payment_entries (id, member_id, amount_cents, paid_day, due_day)
+        SELECT id, member_id, {to_cents.format("amount")},
+               {to_day.format("paid_date")}, {to_day.format("due_date")}
+        FROM payments
+    """)
+    # Keep AUTOINCREMENT from handing out ids of payments deleted before the move
+    cur.execute("""
+        UPDATE sqlite_sequence
+        SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'payments'), 0))
+        WHERE name = 'payment_entries'
+    """)
+    cur.execute("DROP TABLE payments")
+    cur.execute("DROP TABLE revenue_months")
+
+    cur.execute("CREATE INDEX idx_payment_entries_paid ON payment_entries(paid_day, amount_cents)")
+    cur.execute("CREATE INDEX idx_payment_entries_member ON payment_entries(member_id)")
+
+    cur.execute("""
+        CREATE VIEW payments AS
+        SELECT id, member_id,
+               amount_cents / 100.0 AS amount,
+               date(paid_day * 86400, 'unixepoch') AS paid_date,
+               date(due_day * 86400, 'unixepoch') AS due_date
+        FROM payment_entries
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER payments_view_insert INSTEAD OF INSERT ON payments BEGIN
+            INSERT INTO payment_entries (id, member_id, amount_cents, paid_day, due_day)
+            VALUES (new.id, new.member_id, {to_cents.format("new.amount")},
+                    {to_day.format("new.paid_date")}, {to_day.format("new.due_date")});
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER payments_view_update INSTEAD OF UPDATE ON payments BEGIN
+            UPDATE payment_entries
+            SET member_id = new.member_id,
+                amount_cents = {to_cents.format("new.amount")},
+                paid_day = {to_day.format("new.paid_date")},
+                due_day = {to_day.format("new.due_date")}
+            WHERE id = old.id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER payments_view_delete INSTEAD OF DELETE ON payments BEGIN
+            DELETE FROM payment_entries WHERE id = old.id;
+        END
+    """)
+
+    cur.execute("""
+        CREATE TABLE revenue_months (
+            month TEXT PRIMARY KEY,
+            total_cents INTEGER NOT NULL,
+            payments INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER revenue_months_ai AFTER INSERT ON payment_entries
+        WHEN new.paid_day IS NOT NULL BEGIN
+            INSERT INTO revenue_months (month, total_cents, payments)
+            VALUES ({month.format("new.paid_day")}, COALESCE(new.amount_cents, 0), 1)
+            ON CONFLICT(month) DO UPDATE SET total_cents = total_cents + excluded.total_cents,
+                                             payments = payments + 1;
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER revenue_months_ad AFTER DELETE ON payment_entries
+        WHEN old.paid_day IS NOT NULL BEGIN
+            UPDATE revenue_months SET total_cents = total_cents - COALESCE(old.amount_cents, 0),
+                                      payments = payments - 1
+            WHERE month = {month.format("old.paid_day")};
+            DELETE FROM revenue_months WHERE month = {month.format("old.paid_day")} AND payments = 0;
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER revenue_months_au AFTER UPDATE OF amount_cents, paid_day ON payment_entries BEGIN
+            UPDATE revenue_months SET total_cents = total_cents - COALESCE(old.amount_cents, 0),
+                                      payments = payments - 1
+            WHERE month = {month.format("old.paid_day")};
+            DELETE FROM revenue_months WHERE month = {month.format("old.paid_day")} AND payments = 0;
+            INSERT INTO revenue_months (month, total_cents, payments)
+            SELECT {month.format("new.paid_day")}, COALESCE(new.amount_cents, 0), 1
+            WHERE new.paid_day IS NOT NULL
+            ON CONFLICT(month) DO UPDATE SET total_cents = total_cents + excluded.total_cents,
+                                             payments = payments + 1;
+        END
+    """)
+    cur.execute(f"""
+        INSERT INTO revenue_months (month, total_cents, payments)
+        SELECT {month.format("paid_day")}, COALESCE(SUM(amount_cents), 0), COUNT(*)
+        FROM payment_entries WHERE paid_day IS NOT NULL
+        GROUP BY 1
+    """)
+    cur.execute("ANALYZE payment_entries")
+
+
+# --- v10: indexes for the paged payments ledger -------------------------------------
+def payment_ledger_indexes(cur):
+    """Let the ledger walk (paid_day DESC, id DESC) straight off an index.
+
+    Index entries end in the rowid, so (paid_day) is ordered by
+    (paid_day, id) and (member_id, paid_day) by (member_id, paid_day, id):
+    each ledger page, filtered by member or not, is one index range with
+    no sort.
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payment_entries_day ON payment_entries(paid_day)")
+    cur.execute("DROP INDEX IF EXISTS idx_payment_entries_member")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payment_entries_member_day ON payment_entries(member_id, paid_day)")
+    cur.execute("ANALYZE payment_entries")
+
+
+# --- v11: name index for the type-ahead member picker ---------------------------------
+def member_name_index(cur):
+    """Case-insensitive index on members.name.
+
+    ``name LIKE 'abc%'`` is rewritten by SQLite into a range scan on a
+    NOCASE index, so the picker's prefix lookups (and name-ordered lists)
+    read only the rows they return.
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_members_name ON members(name COLLATE NOCASE)")
+    cur.execute("ANALYZE members")
+
+
+# --- v12: trainer history paging and cancellation log -------------------------------
+def booking_history(cur):
+    """Index a trainer's bookings by date and keep a log of cancellations.
+
+    (trainer_id, booking_date) is ordered by (trainer_id, booking_date, id),
+    so each page of the newest-first history dialog is one index range.
+    Cancel and Release delete bookings, so a trigger copies every booking
+    deleted before its date has passed into booking_cancellations; that is
+    what the utilization stats count as cancelled.
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bookings_trainer_date ON trainer_bookings(trainer_id, booking_date)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS booking_cancellations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            booking_id INTEGER NOT NULL,
+            trainer_id INTEGER NOT NULL,
+            member_id INTEGER NOT NULL,
+            slot_id INTEGER NOT NULL,
+            booking_date TEXT NOT NULL,
+            cancelled_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cancellations_trainer_date
+        ON booking_cancellations(trainer_id, booking_date)
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trainer_bookings_cancel_ad AFTER DELETE ON trainer_bookings
+        WHEN old.booking_date >= date('now', 'localtime') BEGIN
+            INSERT INTO booking_cancellations (booking_id, trainer_id, member_id, slot_id, booking_date)
+            VALUES (old.id, old.trainer_id, old.member_id, old.slot_id, old.booking_date);
+        END
+    """)
+    cur.execute("ANALYZE trainer_bookings")
+
+
+# --- v13: a data flag, not a schema change, pauses member search indexing ----------
+def search_index_pause(cur):
+    """Guard members_fts_ai with the search_index_paused flag table.
+
+    Bulk import indexes each chunk with one INSERT ... SELECT. It used to
+    drop and recreate the insert trigger around that, and every schema
+    change makes all other open connections re-prepare their statements.
+    Now the import writes a flag row inside its chunk transaction, which no
+    other connection can see, and the trigger skips rows while it is set.
+    """
+    cur.execute("CREATE TABLE IF NOT EXISTS search_index_paused (paused INTEGER PRIMARY KEY)")
+    trigger = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='members_fts_ai'"
+    ).fetchone()
+    if trigger is None:
+        return   # no FTS5 in this SQLite build
+    cur.execute("DROP TRIGGER members_fts_ai")
+    cur.execute("""
+        CREATE TRIGGER members_fts_ai AFTER INSERT ON members
+        WHEN NOT EXISTS (SELECT 1 FROM search_index_paused) BEGIN
+            INSERT INTO members_fts(rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END
+    """)
+
+
+# --- v14: slot times stored as 24-hour HH:MM -----------------------------------------
+_LEGACY_TIME = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?m\.?)?$", re.IGNORECASE)
+
+
+def _legacy_slot_time(text):
+    """'HH:MM' for a free-text slot time as the app has read it so far, or None.
+
+    Slots were typed on a 12-hour clock without am/pm, so a bare one-digit
+    hour from 1 to 6 means the afternoon ("1:30" is 13:30). This guess is
+    only made here, once; new slots must be entered unambiguously.
+    """
+    match = _LEGACY_TIME.match((text or "").strip())
+    if not match:
+        return None
+    digits, minutes, half = match.groups()
+    hour, minute = int(digits), int(minutes or 0)
+    if minute > 59:
+        return None
+    if half:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if half.lower() == "p" else 0)
+    elif hour > 23:
+        return None
+    elif len(digits) == 1 and 1 <= hour < 7:
+        hour += 12
+    return f"{hour:02d}:{minute:02d}"
+
+
+def slot_times_24h(cur):
+    """Rewrite the free-text slot times as 24-hour HH:MM.
+
+    Rows that cannot be read are left as they are; the booking screens
+    skip them and report them.
+    """
+    for slot_id, start_text, end_text in cur.execute("SELECT id, start_time, end_time FROM slots").fetchall():
+        start, end = _legacy_slot_time(start_text), _legacy_slot_time(end_text)
+        if start and end and end > start:
+            cur.execute("UPDATE slots SET start_time = ?, end_time = ? WHERE id = ?", (start, end, slot_id))
+
+
+# --- v15: explicit cancellations, released sessions kept as completed ---------------
+def booking_outcomes(cur):
+    """Replace the delete trigger with explicit cancel and complete paths.
+
+    trainer_bookings_cancel_ad logged every delete of a booking dated today
+    or later, so Release (which deleted the trainer's sessions for today)
+    showed up as cancellations and lost the sessions from the utilization
+    figures. Cancel now writes booking_cancellations itself (db.cancel_booking)
+    and Release sets completed_at instead of deleting.
+    """
+    cur.execute("DROP TRIGGER IF EXISTS trainer_bookings_cancel_ad")
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(trainer_bookings)")}
+    if "completed_at" not in columns:
+        cur.execute("ALTER TABLE trainer_bookings ADD COLUMN completed_at TEXT")
+
+
+# Position in this list (1-based) is the user_version the step upgrades to
+MIGRATIONS = [
+    base_schema,
+    reconcile_legacy_tables,
+    member_search_index,
+    hot_path_indexes,
+    membership_summary,
+    sparse_attendance,
+    attendance_month_bitmaps,
+    revenue_rollup,
+    typed_payments,
+    payment_ledger_indexes,
+    member_name_index,
+    booking_history,
+    search_index_pause,
+    slot_times_24h,
+    booking_outcomes,
+]
+
+
+def migrate(conn, log=print):
+    """Bring ``conn``'s database up to len(MIGRATIONS), timing each step.
+
+    Returns a list of (version, step name, seconds) for the steps applied.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+    for version, step in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        t0 = perf_counter()
+        conn.execute("BEGIN")
+        try:
+            step(conn.cursor())
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        elapsed = perf_counter() - t0
+        applied.append((version, step.__name__, elapsed))
+        if log:
+            log(f"Migration {version} ({step.__name__}) applied in {elapsed * 1000:.1f} ms")
+    return applied
@@ -0,0 +1,149 @@
+# payment_model.py
+from bisect import bisect_left
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from db import get_payments_page, get_payment, to_day, PAYMENT_PAGE_SIZE
+from change_hub import changes_to
+
+HEADERS = ["Member", "Amount", "Paid Date", "Due Date", "Payment ID"]
+
+
+def _sort_key(paid_day, payment_id):
+    """Ledger order (paid_day DESC, id DESC) as an ascending key."""
+    return (-paid_day, -payment_id)
+
+
+class PaymentLedgerModel(QAbstractTableModel):
+    """Payments ledger, newest first, paged in by keyset on (paid_day, id).
+
+    Filters (member, paid date range) are applied in SQL. Payments written
+    while the ledger is open are patched into the loaded rows by
+    apply_changes() instead of reloading them.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._keys = []   # (-paid_day, -id) per row: ascending, so rows are found by bisect
+        self._filters = (None, None, None)
+        self._exhausted = True
+
+    # --- Loading ---------------------------------------------------------------
+    def set_filters(self, member_id=None, start=None, end=None):
+        """Drop loaded rows and start paging again with new filters."""
+        self.beginResetModel()
+        self._filters = (member_id, start, end)
+        self._rows = get_payments_page(*self._filters)
+        self._keys = [_sort_key(row[0], row[1]) for row in self._rows]
+        self._exhausted = len(self._rows) < PAYMENT_PAGE_SIZE
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        last = self._rows[-1]
+        page = get_payments_page(*self._filters, after=(last[0], last[1]))
+        if len(page) < PAYMENT_PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self._keys.extend(_sort_key(row[0], row[1]) for row in page)
+        self.endInsertRows()
+
+    def add_payment(self, payment_id):
+        """Show a newly recorded payment in place if it matches the filters.
+
+        Returns the row it went to, or -1 when it is filtered out or falls
+        beyond the loaded pages (paging will reach it).
+        """
+        row = get_payment(payment_id)
+        if row is None or row[0] is None or not self._matches(row):
+            return -1
+        key = _sort_key(row[0], row[1])
+        pos = bisect_left(self._keys, key)
+        if pos == len(self._rows) and not self._exhausted:
+            return -1
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self._keys.insert(pos, key)
+        self.endInsertRows()
+        return pos
+
+    def remove_payment(self, paid_day, payment_id):
+        pos = self.row_of(paid_day, payment_id)
+        if pos >= 0:
+            self.beginRemoveRows(QModelIndex(), pos, pos)
+            del self._rows[pos]
+            del self._keys[pos]
+            self.endRemoveRows()
+
+    def row_of(self, paid_day, payment_id):
+        """The loaded row showing ``payment_id`` (paid on ``paid_day``), or -1."""
+        if paid_day is None:
+            return -1
+        key = _sort_key(paid_day, payment_id)
+        pos = bisect_left(self._keys, key)
+        return pos if pos < len(self._keys) and self._keys[pos] == key else -1
+
+    def apply_changes(self, changes):
+        """Patch the loaded rows from a committed batch of db.Changes."""
+        payments = changes_to(changes, "payment_entries")
+        if len(payments) > PAYMENT_PAGE_SIZE:
+            self.set_filters(*self._filters)   # bulk import: one reload is cheaper
+            return
+        for change in payments:
+            if change.op != "insert":
+                self.remove_payment(change.old, change.row_id)   # old carries paid_day
+            if change.op != "delete":
+                self.add_payment(change.row_id)
+
+        deleted = {c.row_id for c in changes_to(changes, "members") if c.op == "delete"}
+        if deleted:
+            for pos, row in enumerate(self._rows):
+                if row[6] in deleted:
+                    self._rows[pos] = row[:2] + (None,) + row[3:]
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, 0))
+
+    def _matches(self, row):
+        member_id, start, end = self._filters
+        if member_id is not None and row[6] != member_id:
+            return False
+        if start and row[0] < to_day(start):
+            return False
+        if end and row[0] > to_day(end):
+            return False
+        return True
+
+    # --- Qt model API ----------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        _, payment_id, name, amount, paid_date, due_date, _ = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return name if name is not None else "(deleted member)"
+            if col == 1:
+                return "" if amount is None else f"{amount:.2f}"
+            return (None, None, paid_date or "", due_date or "", str(payment_id))[col]
+        if role == Qt.TextAlignmentRole and col in (1, 4):
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
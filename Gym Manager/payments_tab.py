@@ -1,24 +1,52 @@
-import sqlite3
 from datetime import datetime, timedelta
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QFormLayout, QLineEdit, QDateEdit, QComboBox, QMessageBox
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QAbstractItemView, QPushButton, QFormLayout,
+    QLineEdit, QDateEdit, QMessageBox, QCheckBox, QLabel
+)
 from PyQt5.QtCore import QDate
 
-DB_NAME = "gym.db"
+from db import insert_payment, to_day, transaction
+from change_hub import shared_change_hub
+from member_picker import MemberPicker
+from payment_model import PaymentLedgerModel
 
 class PaymentsTab(QWidget):
     def __init__(self):
         super().__init__()
         self.layout = QVBoxLayout()
 
-        # Payments Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Member", "Amount", "Paid Date", "Due Date", "Payment ID"])
+        # Ledger filters
+        filters = QHBoxLayout()
+        filters.addWidget(QLabel("Member:"))
+        self.filter_member = MemberPicker(placeholder="All members")
+        self.filter_member.setMinimumWidth(260)
+        filters.addWidget(self.filter_member)
+        self.filter_dates = QCheckBox("Paid between")
+        filters.addWidget(self.filter_dates)
+        self.filter_from = QDateEdit(QDate.currentDate().addMonths(-1), calendarPopup=True)
+        self.filter_from.setDisplayFormat("yyyy-MM-dd")
+        filters.addWidget(self.filter_from)
+        filters.addWidget(QLabel("and"))
+        self.filter_to = QDateEdit(QDate.currentDate(), calendarPopup=True)
+        self.filter_to.setDisplayFormat("yyyy-MM-dd")
+        filters.addWidget(self.filter_to)
+        filter_btn = QPushButton("Filter")
+        filter_btn.clicked.connect(self.load_payments)
+        filters.addWidget(filter_btn)
+        filters.addStretch()
+        self.layout.addLayout(filters)
+
+        # Payments Table (pages in as it scrolls)
+        self.model = PaymentLedgerModel(self)
+        shared_change_hub().changed.connect(self.model.apply_changes)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.layout.addWidget(self.table)
 
         # Form for adding payment
         form_layout = QFormLayout()
-        self.member_dropdown = QComboBox()
+        self.member_picker = MemberPicker()
         self.amount_input = QLineEdit()
         self.paid_date_input = QDateEdit()
         self.paid_date_input.setDate(QDate.currentDate())
@@ -28,7 +56,7 @@ class PaymentsTab(QWidget):
         self.due_date_input.setDate(QDate.currentDate().addMonths(1))
         self.due_date_input.setCalendarPopup(True)
 
-        form_layout.addRow("Member:", self.member_dropdown)
+        form_layout.addRow("Member:", self.member_picker)
         form_layout.addRow("Amount:", self.amount_input)
         form_layout.addRow("Paid Date:", self.paid_date_input)
         form_layout.addRow("Due Date:", self.due_date_input)
@@ -42,44 +70,34 @@ class PaymentsTab(QWidget):
 
         self.setLayout(self.layout)
 
-        self.load_members()
         self.load_payments()
 
-    def load_members(self):
-        """Load all members into dropdown"""
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM members")
-        members = cursor.fetchall()
-        conn.close()
-
-        self.member_dropdown.clear()
-        for member in members:
-            self.member_dropdown.addItem(f"{member[1]} (ID:{member[0]})", member[0])
+    def clear_session(self):
+        """Clear the payment form, and the ledger filters if any were set."""
+        self.member_picker.clear_member()
+        self.amount_input.clear()
+        if self.filter_member.text() or self.filter_dates.isChecked():
+            self.filter_member.clear_member()
+            self.filter_dates.setChecked(False)
+            self.load_payments()
 
     def load_payments(self):
-        """Load all payments into table"""
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT m.name, p.amount, p.paid_date, p.due_date, p.id
-            FROM payments p
-            JOIN members m ON p.member_id = m.id
-            ORDER BY p.paid_date DESC
-        """)
-        payments = cursor.fetchall()
-        conn.close()
-
-        self.table.setRowCount(len(payments))
-        for row, payment in enumerate(payments):
-            for col, value in enumerate(payment):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        """(Re)start the ledger with the current filters; later pages load on scroll."""
+        start = end = None
+        if self.filter_dates.isChecked():
+            start = self.filter_from.date().toString("yyyy-MM-dd")
+            end = self.filter_to.date().toString("yyyy-MM-dd")
+        self.model.set_filters(self.filter_member.member_id(), start, end)
+        self.table.resizeColumnsToContents()
 
     def add_payment(self):
         """Insert new payment for selected member and extend membership end_date"""
-        member_id = self.member_dropdown.currentData()
+        member_id = self.member_picker.member_id()
         amount = self.amount_input.text()
 
+        if member_id is None:
+            QMessageBox.warning(self, "Input Error", "Select a member from the suggestions")
+            return
         if not amount.strip():
             QMessageBox.warning(self, "Input Error", "Amount cannot be empty")
             return
@@ -87,34 +105,32 @@ class PaymentsTab(QWidget):
         paid_date = self.paid_date_input.date().toString("yyyy-MM-dd")
         due_date = self.due_date_input.date().toString("yyyy-MM-dd")
 
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
         try:
-            # Insert new payment
-            cursor.execute("""
-                INSERT INTO payments (member_id, amount, paid_date, due_date)
-                VALUES (?, ?, ?, ?)
-            """, (member_id, float(amount), paid_date, due_date))
+            with transaction() as conn:
+                cursor = conn.cursor()
 
-            # Extend member's end_date automatically
-            cursor.execute("SELECT end_date FROM members WHERE id = ?", (member_id,))
-            current_end = cursor.fetchone()[0]
+                # Insert new payment
+                payment_id = insert_payment(member_id, float(amount), paid_date, due_date)
 
-            if current_end:
-                current_end_dt = datetime.strptime(current_end, "%Y-%m-%d")
-                new_end_dt = max(current_end_dt, datetime.strptime(paid_date, "%Y-%m-%d")) + timedelta(days=30)
-            else:
-                new_end_dt = datetime.strptime(paid_date, "%Y-%m-%d") + timedelta(days=30)
+                # Extend member's end_date automatically
+                cursor.execute("SELECT end_date FROM members WHERE id = ?", (member_id,))
+                current_end = cursor.fetchone()[0]
 
-            cursor.execute("UPDATE members SET end_date = ? WHERE id = ?", (new_end_dt.strftime("%Y-%m-%d"), member_id))
+                if current_end:
+                    current_end_dt = datetime.strptime(current_end, "%Y-%m-%d")
+                    new_end_dt = max(current_end_dt, datetime.strptime(paid_date, "%Y-%m-%d")) + timedelta(days=30)
+                else:
+                    new_end_dt = datetime.strptime(paid_date, "%Y-%m-%d") + timedelta(days=30)
+
+                cursor.execute("UPDATE members SET end_date = ? WHERE id = ?", (new_end_dt.strftime("%Y-%m-%d"), member_id))
 
-            conn.commit()
             QMessageBox.information(self, "Success", f"Payment added. Membership extended until {new_end_dt.date()}.")
 
             self.amount_input.clear()
-            self.load_payments()
+            # The ledger has already picked the payment up from the change hub
+            row = self.model.row_of(to_day(paid_date), payment_id)
+            if row >= 0:
+                self.table.scrollTo(self.model.index(row, 0))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add payment: {e}")
-        finally:
-            conn.close()
@@ -0,0 +1,242 @@
+# report_export.py
+"""Streaming CSV / XLSX export of the report queries.
+
+Rows are pulled from the SQL cursor one at a time and written straight to
+disk, so memory use does not depend on the size of the report. XLSX files
+are produced with zipfile (one inline-string worksheet) to avoid needing a
+spreadsheet library.
+"""
+import csv
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from PyQt5.QtCore import QObject, QThreadPool
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from db import (
+    iter_payments_report, iter_members_report, iter_revenue_report, iter_attendance_report,
+    get_attendance_summary
+)
+from report_pdf import render_pdf, RenderCancelled
+from workers import Task
+
+PAYMENTS_HEADERS = ["Member", "Amount", "Paid Date", "Due Date", "Status"]
+MEMBERS_HEADERS = ["Name", "Phone", "Email", "Plan", "End Date", "Status"]
+REVENUE_HEADERS = ["Month", "Total Amount"]
+ATTENDANCE_HEADERS = ["Member Name", "Date", "Status"]
+ATTENDANCE_SUMMARY_HEADERS = ["Member Name", "Present Days", "Attendance %", "Last Visit", "Longest Streak"]
+
+
+# --- Row sources (shared with the report tables) --------------------------------
+def payment_status(due_date, today):
+    """'OK', 'Due Soon', 'Overdue' or '—' for a due date string."""
+    try:
+        if due_date:
+            due = datetime.strptime(due_date, "%Y-%m-%d").date()
+            if due < today:
+                return "Overdue"
+            if (due - today).days <= 3:
+                return "Due Soon"
+    except ValueError:
+        return "—"
+    return "OK"
+
+
+def member_status(end_date, today):
+    """'Active', 'Expired' or 'Unknown' for an end date string."""
+    try:
+        if end_date:
+            d = datetime.strptime(end_date, "%Y-%m-%d").date()
+            return "Active" if d >= today else "Expired"
+    except ValueError:
+        pass
+    return "Unknown"
+
+
+def payments_rows(start, end):
+    today = datetime.today().date()
+    for member, amount, paid_date, due_date in iter_payments_report(start, end):
+        yield [member or "", float(amount or 0), paid_date or "", due_date or "",
+               payment_status(due_date, today)]
+
+
+def members_rows():
+    today = datetime.today().date()
+    for name, phone, email, plan, end_date in iter_members_report():
+        yield [name or "", phone or "", email or "", plan or "", end_date or "",
+               member_status(end_date, today)]
+
+
+def revenue_rows(start, end):
+    for ym, total in iter_revenue_report(start, end):
+        yield [ym or "", float(total or 0)]
+
+
+def attendance_rows(start, end):
+    for name, date, status in iter_attendance_report(start, end):
+        yield [name or "", date, status]
+
+
+def attendance_summary_rows(start, end):
+    for _, name, days, pct, last, streak in get_attendance_summary(start, end):
+        yield [name or "", days, pct if pct is not None else "", last or "", streak]
+
+
+# --- Writers ---------------------------------------------------------------------
+def write_csv(path, headers, rows):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = _XML_ILLEGAL.sub("", escape("" if value is None else str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def write_xlsx(path, headers, rows, sheet_name="Report"):
+    count = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31])))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        b'<sheetData>')
+            sheet.write(("<row>" + "".join(_xlsx_cell(h) for h in headers) + "</row>").encode("utf-8"))
+            for row in rows:
+                sheet.write(("<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>").encode("utf-8"))
+                count += 1
+            sheet.write(b"</sheetData></worksheet>")
+    return count
+
+
+def export_rows(path, headers, rows, sheet_name="Report"):
+    """Write ``rows`` to ``path`` as XLSX or CSV (by extension); returns row count."""
+    if path.lower().endswith(".xlsx"):
+        return write_xlsx(path, headers, rows, sheet_name)
+    return write_csv(path, headers, rows)
+
+
+EXPORT_FILTER = "CSV Files (*.csv);;Excel Workbook (*.xlsx)"
+
+
+def export_path_with_suffix(path, selected_filter):
+    """Append .csv / .xlsx when the user typed a bare name."""
+    if not path.lower().endswith((".csv", ".xlsx")):
+        path += ".xlsx" if "xlsx" in selected_filter else ".csv"
+    return path
+
+
+# --- Qt glue ---------------------------------------------------------------------
+class ReportExporter(QObject):
+    """Ask for a file name and stream a report to it on a worker thread.
+
+    ``make_rows(*args)`` is called on the worker so the SQL cursor is created
+    and consumed on that thread's own connection.
+    """
+
+    def __init__(self, parent_widget):
+        super().__init__(parent_widget)
+        self.parent_widget = parent_widget
+        self.dialog = None
+
+    def export(self, title, headers, make_rows, *args):
+        path, selected = QFileDialog.getSaveFileName(
+            self.parent_widget, f"Export {title}", f"{title}.csv", EXPORT_FILTER
+        )
+        if not path:
+            return
+        path = export_path_with_suffix(path, selected)
+
+        self.dialog = QProgressDialog(f"Exporting {title}...", None, 0, 0, self.parent_widget)
+        self.dialog.setWindowTitle("Export")
+        self.dialog.setMinimumDuration(0)
+        self.dialog.show()
+
+        task = Task(path, lambda: export_rows(path, headers, make_rows(*args), title))
+        task.signals.finished.connect(self._finished)
+        task.signals.failed.connect(self._failed)
+        QThreadPool.globalInstance().start(task)
+
+    def export_pdf(self, title, headers, make_rows, *args):
+        """Render the report to PDF on a worker thread with progress and cancel."""
+        path, _ = QFileDialog.getSaveFileName(
+            self.parent_widget, f"Save {title} as PDF", f"{title}.pdf", "PDF Files (*.pdf)"
+        )
+        if not path:
+            return
+        if not path.lower().endswith(".pdf"):
+            path += ".pdf"
+
+        task = Task(path, lambda progress, cancelled: render_pdf(
+            path, title, headers, make_rows(*args), progress=progress, cancelled=cancelled
+        ), with_progress=True, cancellable=True)
+
+        self.dialog = QProgressDialog(f"Rendering {title}...", "Cancel", 0, 0, self.parent_widget)
+        self.dialog.setWindowTitle("PDF")
+        self.dialog.setMinimumDuration(0)
+        self.dialog.canceled.connect(task.cancel)
+        self.dialog.show()
+
+        task.signals.progress.connect(self._pdf_progress)
+        task.signals.finished.connect(self._pdf_finished)
+        task.signals.failed.connect(self._failed)
+        QThreadPool.globalInstance().start(task)
+
+    def _pdf_progress(self, path, values):
+        pages, rows = values
+        self.dialog.setLabelText(f"Rendered {pages} pages ({rows} rows)")
+
+    def _pdf_finished(self, path, result):
+        self.dialog.close()
+        pages, rows = result
+        QMessageBox.information(self.parent_widget, "PDF", f"Saved {pages} pages ({rows} rows) to {path}")
+
+    def _finished(self, path, count):
+        self.dialog.close()
+        QMessageBox.information(self.parent_widget, "Export", f"Exported {count} rows to {path}")
+
+    def _failed(self, path, error):
+        self.dialog.close()
+        if RenderCancelled.__name__ in error.splitlines()[-1]:
+            return  # user pressed Cancel; the partial file is already gone
+        QMessageBox.critical(self.parent_widget, "Error", f"Export failed: {error.splitlines()[-1]}")
@@ -0,0 +1,115 @@
+# report_pdf.py
+"""PDF rendering of the report row sources with reportlab.
+
+Rows are consumed from the generator one page at a time: each page gets its
+own Table flowable, sized to fit the page, which is drawn and dropped before
+the next page is built. Only the compressed page streams accumulate in the
+canvas until save() (about 15 KB a page), so a multi-thousand-page report
+never holds its whole story of flowables in memory and every row is written.
+"""
+import os
+from datetime import datetime
+from itertools import islice
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 12 * mm
+FOOTER = 8 * mm
+FONT_SIZE = 8
+
+TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), FONT_SIZE),
+    ("TOPPADDING", (0, 0), (-1, -1), 2),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#dddddd")),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+])
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+def _cell(value, max_chars):
+    if isinstance(value, float):
+        value = f"{value:.2f}"
+    text = "" if value is None else str(value)
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def _table(headers, chunk, col_w):
+    return Table([headers] + chunk, colWidths=[col_w] * len(headers), style=TABLE_STYLE)
+
+
+def render_pdf(path, title, headers, rows, progress=None, cancelled=None):
+    """Render ``rows`` as a paginated table PDF at ``path``.
+
+    ``progress(pages, rows)`` is called after each page; if ``cancelled()``
+    returns True the partial file is removed and RenderCancelled is raised.
+    Returns (pages, rows).
+    """
+    width, height = PAGE_SIZE
+    body_w = width - 2 * MARGIN
+    body_top = height - MARGIN
+    body_h = body_top - MARGIN - FOOTER
+    col_w = body_w / len(headers)
+    max_chars = max(4, int(col_w / (FONT_SIZE * 0.55)))
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    heading = Paragraph(title, getSampleStyleSheet()["Heading2"])
+    _, heading_h = heading.wrap(body_w, body_h)
+
+    # Every cell is a single truncated line, so all rows share one height
+    _, probe_h = _table(headers, [["X"] * len(headers)], col_w).wrap(body_w, body_h)
+    row_h = probe_h / 2
+    per_page = int(body_h / row_h) - 1
+    first_page = int((body_h - heading_h) / row_h) - 1
+
+    c = canvas.Canvas(path, pagesize=PAGE_SIZE, pageCompression=1)
+    c.setTitle(title)
+    rows = iter(rows)
+    pages = total = 0
+    try:
+        while True:
+            capacity = first_page if pages == 0 else per_page
+            chunk = [[_cell(v, max_chars) for v in row] for row in islice(rows, capacity)]
+            if not chunk and pages:
+                break
+
+            top = body_top
+            if pages == 0:
+                heading.wrapOn(c, body_w, body_h)
+                heading.drawOn(c, MARGIN, top - heading_h)
+                top -= heading_h
+            table = _table(headers, chunk, col_w)
+            _, table_h = table.wrapOn(c, body_w, body_h)
+            table.drawOn(c, MARGIN, top - table_h)
+
+            pages += 1
+            total += len(chunk)
+            c.setFont("Helvetica", FONT_SIZE)
+            c.drawString(MARGIN, MARGIN, f"{title} - generated {generated}")
+            c.drawRightString(width - MARGIN, MARGIN, f"Page {pages}")
+            c.showPage()
+
+            if progress:
+                progress(pages, total)
+            if cancelled and cancelled():
+                raise RenderCancelled()
+            if len(chunk) < capacity:
+                break
+        c.save()
+    except RenderCancelled:
+        del c
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return pages, total
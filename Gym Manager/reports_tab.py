@@ -5,7 +5,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor
-from db import connect_db
+from db import iter_payments_report, iter_members_report, iter_revenue_report
+from report_export import (
+    ReportExporter, payments_rows, members_rows, revenue_rows, payment_status, member_status,
+    PAYMENTS_HEADERS, MEMBERS_HEADERS, REVENUE_HEADERS
+)
 
 from datetime import datetime
 from collections import defaultdict
@@ -20,6 +24,7 @@ class ReportsTab(QWidget):
 
     # --- UI -------------------------------------------------------------------
     def _init_ui(self):
+        self.exporter = ReportExporter(self)
         root = QVBoxLayout()
         self.tabs = QTabWidget()
 
@@ -51,8 +56,20 @@ class ReportsTab(QWidget):
 
         btn = QPushButton("Load")
         btn.clicked.connect(self.load_payments_report)
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(lambda: self.exporter.export(
+            "Payments Report", PAYMENTS_HEADERS, payments_rows,
+            self.pay_from.date().toString("yyyy-MM-dd"), self.pay_to.date().toString("yyyy-MM-dd")
+        ))
+        pdf_btn = QPushButton("PDF")
+        pdf_btn.clicked.connect(lambda: self.exporter.export_pdf(
+            "Payments Report", PAYMENTS_HEADERS, payments_rows,
+            self.pay_from.date().toString("yyyy-MM-dd"), self.pay_to.date().toString("yyyy-MM-dd")
+        ))
         filters.addStretch()
         filters.addWidget(btn)
+        filters.addWidget(export_btn)
+        filters.addWidget(pdf_btn)
 
         layout.addLayout(filters)
 
@@ -72,17 +89,7 @@ class ReportsTab(QWidget):
         start = self.pay_from.date().toString("yyyy-MM-dd")
         end = self.pay_to.date().toString("yyyy-MM-dd")
 
-        conn = connect_db()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT m.name, p.amount, p.paid_date, p.due_date
-            FROM payments p
-            JOIN members m ON m.id = p.member_id
-            WHERE date(p.paid_date) BETWEEN date(?) AND date(?)
-            ORDER BY p.paid_date ASC;
-        """, (start, end))
-        rows = cur.fetchall()
-        conn.close()
+        rows = iter_payments_report(start, end).fetchall()
 
         self.pay_table.setRowCount(0)
         total = 0.0
@@ -98,19 +105,13 @@ class ReportsTab(QWidget):
             self.pay_table.setItem(i, 2, QTableWidgetItem(paid_date or ""))
             self.pay_table.setItem(i, 3, QTableWidgetItem(due_date or ""))
 
-            status_item = QTableWidgetItem("OK")
-            try:
-                if due_date:
-                    due = datetime.strptime(due_date, "%Y-%m-%d").date()
-                    if due < today:
-                        overdue += 1
-                        status_item.setText("Overdue")
-                        status_item.setBackground(QColor(255, 150, 150))
-                    elif (due - today).days <= 3:
-                        status_item.setText("Due Soon")
-                        status_item.setBackground(QColor(255, 255, 150))
-            except Exception:
-                status_item.setText("—")
+            status = payment_status(due_date, today)
+            status_item = QTableWidgetItem(status)
+            if status == "Overdue":
+                overdue += 1
+                status_item.setBackground(QColor(255, 150, 150))
+            elif status == "Due Soon":
+                status_item.setBackground(QColor(255, 255, 150))
             self.pay_table.setItem(i, 4, status_item)
 
         self.pay_summary.setText(f"Totals: {len(rows)} payments, Total = {total:.2f} | Overdue = {overdue}")
@@ -125,9 +126,19 @@ class ReportsTab(QWidget):
         self.mem_summary = QLabel("Active: 0 | Expired: 0 | Total: 0")
         reload_btn = QPushButton("Refresh")
         reload_btn.clicked.connect(self.load_members_report)
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(lambda: self.exporter.export(
+            "Members Report", MEMBERS_HEADERS, members_rows
+        ))
+        pdf_btn = QPushButton("PDF")
+        pdf_btn.clicked.connect(lambda: self.exporter.export_pdf(
+            "Members Report", MEMBERS_HEADERS, members_rows
+        ))
         top.addWidget(self.mem_summary)
         top.addStretch()
         top.addWidget(reload_btn)
+        top.addWidget(export_btn)
+        top.addWidget(pdf_btn)
         layout.addLayout(top)
 
         self.mem_table = QTableWidget()
@@ -140,11 +151,7 @@ class ReportsTab(QWidget):
         return w
 
     def load_members_report(self):
-        conn = connect_db()
-        cur = conn.cursor()
-        cur.execute("SELECT name, phone, email, membership_plan, end_date FROM members ORDER BY name COLLATE NOCASE;")
-        rows = cur.fetchall()
-        conn.close()
+        rows = iter_members_report().fetchall()
 
         self.mem_table.setRowCount(0)
         today = datetime.today().date()
@@ -158,21 +165,13 @@ class ReportsTab(QWidget):
             self.mem_table.setItem(i, 3, QTableWidgetItem(plan or ""))
             self.mem_table.setItem(i, 4, QTableWidgetItem(end_date or ""))
 
-            status_item = QTableWidgetItem()
-            try:
-                if end_date:
-                    d = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    if d >= today:
-                        status_item.setText("Active")
-                        active += 1
-                    else:
-                        status_item.setText("Expired")
-                        status_item.setBackground(QColor(255, 150, 150))
-                        expired += 1
-                else:
-                    status_item.setText("Unknown")
-            except Exception:
-                status_item.setText("Unknown")
+            status = member_status(end_date, today)
+            status_item = QTableWidgetItem(status)
+            if status == "Active":
+                active += 1
+            elif status == "Expired":
+                status_item.setBackground(QColor(255, 150, 150))
+                expired += 1
 
             self.mem_table.setItem(i, 5, status_item)
 
@@ -199,8 +198,20 @@ class ReportsTab(QWidget):
 
         load_btn = QPushButton("Load")
         load_btn.clicked.connect(self.load_revenue_report)
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(lambda: self.exporter.export(
+            "Revenue Report", REVENUE_HEADERS, revenue_rows,
+            self.rev_from.date().toString("yyyy-MM-dd"), self.rev_to.date().toString("yyyy-MM-dd")
+        ))
+        pdf_btn = QPushButton("PDF")
+        pdf_btn.clicked.connect(lambda: self.exporter.export_pdf(
+            "Revenue Report", REVENUE_HEADERS, revenue_rows,
+            self.rev_from.date().toString("yyyy-MM-dd"), self.rev_to.date().toString("yyyy-MM-dd")
+        ))
         filters.addStretch()
         filters.addWidget(load_btn)
+        filters.addWidget(export_btn)
+        filters.addWidget(pdf_btn)
 
         layout.addLayout(filters)
 
@@ -220,17 +231,7 @@ class ReportsTab(QWidget):
         start = self.rev_from.date().toString("yyyy-MM-dd")
         end = self.rev_to.date().toString("yyyy-MM-dd")
 
-        conn = connect_db()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT strftime('%Y-%m', paid_date) AS ym, SUM(amount)
-            FROM payments
-            WHERE date(paid_date) BETWEEN date(?) AND date(?)
-            GROUP BY ym
-            ORDER BY ym ASC;
-        """, (start, end))
-        rows = cur.fetchall()
-        conn.close()
+        rows = iter_revenue_report(start, end).fetchall()
 
         self.rev_table.setRowCount(0)
         grand_total = 0.0
@@ -0,0 +1,74 @@
+# revenue_rollup.py
+"""Maintenance for the revenue_months rollup behind the revenue report.
+
+    python revenue_rollup.py check     # compare the rollup with payments
+    python revenue_rollup.py rebuild   # recompute it from payments
+
+Triggers keep the rollup current; rebuild is for backfills done with
+triggers disabled or after restoring payments from elsewhere.
+"""
+import argparse
+import sys
+
+import db
+
+MONTH = "strftime('%Y-%m', paid_day * 86400, 'unixepoch')"
+
+
+def rebuild_revenue_rollup():
+    """Recompute revenue_months from payment_entries in one transaction; returns months written."""
+    conn = db.connect_db()
+    with conn:
+        conn.execute("DELETE FROM revenue_months")
+        cur = conn.execute(f"""
+            INSERT INTO revenue_months (month, total_cents, payments)
+            SELECT {MONTH}, COALESCE(SUM(amount_cents), 0), COUNT(*)
+            FROM payment_entries WHERE paid_day IS NOT NULL
+            GROUP BY 1
+        """)
+    return cur.rowcount
+
+
+def check_revenue_rollup():
+    """Months where the rollup disagrees with payments.
+
+    Returns (month, rollup total, actual total, rollup count, actual count)
+    tuples with totals in currency units; an empty list means the rollup is
+    consistent. Totals are integer cents, so they must match exactly.
+    """
+    return db.connect_db().execute(f"""
+        SELECT month, SUM(rolled) / 100.0, SUM(actual) / 100.0, SUM(rolled_n), SUM(actual_n)
+        FROM (
+            SELECT month, total_cents AS rolled, 0 AS actual, payments AS rolled_n, 0 AS actual_n
+            FROM revenue_months
+            UNION ALL
+            SELECT {MONTH}, 0, COALESCE(amount_cents, 0), 0, 1
+            FROM payment_entries WHERE paid_day IS NOT NULL
+        )
+        GROUP BY month
+        HAVING SUM(rolled) <> SUM(actual) OR SUM(rolled_n) <> SUM(actual_n)
+        ORDER BY month
+    """).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the monthly revenue rollup.")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", default=db.DB_NAME, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db.DB_NAME = args.db
+    db.initialize_db()
+    if args.command == "rebuild":
+        print(f"Rebuilt revenue rollup: {rebuild_revenue_rollup()} months.")
+        return 0
+
+    mismatches = check_revenue_rollup()
+    for month, rolled, actual, rolled_n, actual_n in mismatches:
+        print(f"{month}: rollup {rolled:.2f} ({rolled_n} payments), payments {actual:.2f} ({actual_n})")
+    print("Revenue rollup is consistent." if not mismatches else f"{len(mismatches)} month(s) differ.")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# series_booking.py
+"""Recurring trainer bookings (e.g. a 12-week package).
+
+The dialog turns weekdays, a date range and a set of slots into dates and
+checks the whole series with availability.plan_series before anything is
+written: trainer conflicts, the member's other sessions, the gender rule
+and membership expiry. Booking inserts every session that passed in one
+transaction and reports the rest per date.
+"""
+from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QDateEdit, QCheckBox,
+    QListWidget, QListWidgetItem, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox
+)
+
+from availability import book_series, load_slots, plan_series, series_dates, slot_label
+from member_picker import MemberPicker
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+DEFAULT_WEEKS = 12
+CONFLICT_COLOR = QColor("#f8d7da")
+
+
+class SeriesBookingDialog(QDialog):
+    def __init__(self, trainer_id, trainer_name, member=None, parent=None):
+        super().__init__(parent)
+        self.trainer_id = trainer_id
+        self.setWindowTitle(f"Book Series: {trainer_name}")
+        self.slots = load_slots()
+        self.booked = 0
+        layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.member_picker = MemberPicker(active_only=True)
+        self.member_picker.setMinimumWidth(320)
+        if member is not None:
+            self.member_picker.set_member(member)
+        self.member_picker.memberChanged.connect(self.clear_report)
+        form.addRow("Member:", self.member_picker)
+
+        self.start_input = QDateEdit(QDate.currentDate())
+        self.end_input = QDateEdit(QDate.currentDate().addDays(DEFAULT_WEEKS * 7 - 1))
+        dates = QHBoxLayout()
+        for edit in (self.start_input, self.end_input):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.dateChanged.connect(self.clear_report)
+        dates.addWidget(self.start_input)
+        dates.addWidget(QLabel("to"))
+        dates.addWidget(self.end_input)
+        form.addRow("From:", dates)
+
+        days = QHBoxLayout()
+        self.day_boxes = []
+        for name in WEEKDAYS:
+            box = QCheckBox(name)
+            box.toggled.connect(self.clear_report)
+            self.day_boxes.append(box)
+            days.addWidget(box)
+        form.addRow("On:", days)
+
+        self.slot_list = QListWidget()
+        self.slot_list.setMaximumHeight(110)
+        for slot in self.slots.values():
+            item = QListWidgetItem(slot_label(slot))
+            item.setData(Qt.UserRole, slot.id)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.slot_list.addItem(item)
+        self.slot_list.itemChanged.connect(self.clear_report)
+        form.addRow("Slots:", self.slot_list)
+        layout.addLayout(form)
+
+        check_btn = QPushButton("Check Series")
+        check_btn.clicked.connect(self.check_series)
+        layout.addWidget(check_btn)
+
+        self.report = QTableWidget(0, 3)
+        self.report.setHorizontalHeaderLabels(["Date", "Slot", "Result"])
+        self.report.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.report.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.report)
+
+        self.summary = QLabel("Choose weekdays and slots, then check the series.")
+        layout.addWidget(self.summary)
+
+        self.book_btn = QPushButton("Book Sessions")
+        self.book_btn.setEnabled(False)
+        self.book_btn.clicked.connect(self.book)
+        layout.addWidget(self.book_btn)
+
+        self.setLayout(layout)
+        self.resize(560, 600)
+
+    def _request(self):
+        """(member, slot ids, dates) for the current inputs, or None after a warning."""
+        member = self.member_picker.member()
+        weekdays = {i for i, box in enumerate(self.day_boxes) if box.isChecked()}
+        slot_ids = [self.slot_list.item(i).data(Qt.UserRole) for i in range(self.slot_list.count())
+                    if self.slot_list.item(i).checkState() == Qt.Checked]
+        start = self.start_input.date().toString("yyyy-MM-dd")
+        end = self.end_input.date().toString("yyyy-MM-dd")
+        if member is None:
+            problem = "Select a member from the suggestions."
+        elif not weekdays or not slot_ids:
+            problem = "Choose at least one weekday and one slot."
+        elif end < start:
+            problem = "The end date is before the start date."
+        else:
+            dates = series_dates(start, end, weekdays)
+            if dates:
+                return member, slot_ids, dates
+            problem = "No chosen weekday falls in that date range."
+        QMessageBox.warning(self, "Input Error", problem)
+        return None
+
+    def clear_report(self, *args):
+        self.report.setRowCount(0)
+        self.book_btn.setEnabled(False)
+        self.book_btn.setText("Book Sessions")
+
+    def check_series(self):
+        request = self._request()
+        if request is None:
+            return
+        bookable, conflicts = plan_series(self.trainer_id, *request, slots=self.slots)
+        self.show_report(bookable, conflicts)
+        self.book_btn.setEnabled(bool(bookable))
+        self.book_btn.setText(f"Book {len(bookable)} Sessions")
+
+    def show_report(self, bookable, conflicts):
+        rows = [(d, slot, "Bookable") for d, slot in bookable] + conflicts
+        rows.sort(key=lambda r: (r[0], r[1].start))
+        self.report.setRowCount(len(rows))
+        for row_index, (booking_date, slot, result) in enumerate(rows):
+            items = [QTableWidgetItem(booking_date), QTableWidgetItem(slot_label(slot)), QTableWidgetItem(result)]
+            for col_index, item in enumerate(items):
+                if result != "Bookable":
+                    item.setBackground(CONFLICT_COLOR)
+                self.report.setItem(row_index, col_index, item)
+        self.report.resizeColumnsToContents()
+        dates_hit = len({c[0] for c in conflicts})
+        self.summary.setText(f"{len(bookable)} sessions bookable, {len(conflicts)} conflicts "
+                             f"on {dates_hit} dates.")
+
+    def book(self):
+        request = self._request()
+        if request is None:
+            return
+        try:
+            bookable, conflicts = book_series(self.trainer_id, *request)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to book series: {e}")
+            return
+        self.booked += len(bookable)
+        self.show_report([], conflicts)
+        self.summary.setText(f"Booked {len(bookable)} sessions, skipped {len(conflicts)}.")
+        self.book_btn.setEnabled(False)
+        message = f"Booked {len(bookable)} sessions."
+        if conflicts:
+            message += f" {len(conflicts)} sessions were skipped; see the conflict report."
+        QMessageBox.information(self, "Success", message)
+        if not conflicts:
+            self.accept()
@@ -1,15 +1,17 @@
 # slots_tab.py
-import sqlite3
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QComboBox, QLineEdit, QMessageBox
 from PyQt5.QtCore import Qt
 
-DB_NAME = "gym.db"
+from availability import format_minutes, is_ambiguous_time, parse_slot
+from db import connect_db, transaction
+from change_hub import shared_change_hub, changes_to
 
 class SlotsTab(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
         self.load_slots()
+        shared_change_hub().changed.connect(self.apply_changes)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -45,11 +47,10 @@ class SlotsTab(QWidget):
 
     def load_slots(self):
         """Load slots from DB"""
-        conn = sqlite3.connect(DB_NAME)
+        conn = connect_db()
         cursor = conn.cursor()
         cursor.execute("SELECT id, start_time, end_time, gender FROM slots ORDER BY start_time")
         rows = cursor.fetchall()
-        conn.close()
 
         self.table.setRowCount(0)
         for row_index, row in enumerate(rows):
@@ -57,6 +58,15 @@ class SlotsTab(QWidget):
             for col_index, value in enumerate(row):
                 self.table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
 
+    def apply_changes(self, changes):
+        # A handful of rows kept in start-time order; re-reading is simplest
+        if changes_to(changes, "slots"):
+            self.load_slots()
+
+    def clear_session(self):
+        self.start_input.clear()
+        self.end_input.clear()
+
     def add_slot(self):
         start = self.start_input.text().strip()
         end = self.end_input.text().strip()
@@ -66,15 +76,25 @@ class SlotsTab(QWidget):
             QMessageBox.warning(self, "Input Error", "Please enter start and end time.")
             return
 
+        # Stored as 24-hour HH:MM so the booking checks never have to guess
+        for text in (start, end):
+            if is_ambiguous_time(text):
+                QMessageBox.warning(self, "Input Error",
+                                    f"Is {text} in the morning or the evening? Enter it as a 24-hour time "
+                                    "(06:00 or 18:00) or add am/pm.")
+                return
+        interval = parse_slot(start, end)
+        if interval is None:
+            QMessageBox.warning(self, "Input Error",
+                                "Enter times like 07:00 or 5:30 pm, with the end after the start.")
+            return
+        start, end = format_minutes(interval[0]), format_minutes(interval[1])
+
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO slots (start_time, end_time, gender) VALUES (?, ?, ?)", (start, end, gender))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute("INSERT INTO slots (start_time, end_time, gender) VALUES (?, ?, ?)", (start, end, gender))
             QMessageBox.information(self, "Success", "Slot added successfully!")
             self.start_input.clear()
             self.end_input.clear()
-            self.load_slots()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add slot: {e}")
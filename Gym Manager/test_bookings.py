@@ -0,0 +1,71 @@
+# test_bookings.py
+"""Booking rules around Release, run against a throwaway database.
+
+Usage: python -m unittest test_bookings   (from the Gym Manager folder)
+"""
+import unittest
+from datetime import date, timedelta
+
+from availability import (
+    DaySchedule, book_series, load_slots, plan_series, started_slot_ids, trainer_status
+)
+from bench_data import temp_database, seed_members
+from db import complete_sessions, connect_db, transaction
+
+TRAINER = 1
+MEMBER = (1, "Member 000001", None, "", None)   # picker row; no gender so every slot fits
+
+
+class ReleaseTest(unittest.TestCase):
+    def setUp(self):
+        database = temp_database("test.db")
+        database.__enter__()
+        self.addCleanup(database.__exit__, None, None, None)
+        seed_members(5, booking_ratio=0)
+        self.slots = load_slots()
+        self.morning, self.evening = self.slots[1], self.slots[4]   # 07:00-09:00, 17:00-19:00
+        self.today = date.today().isoformat()
+
+    def release(self, minute):
+        """What the Release button does for TRAINER today at ``minute``."""
+        with transaction():
+            return complete_sessions(TRAINER, self.today, started_slot_ids(self.slots, minute))
+
+    def open_bookings(self):
+        return connect_db().execute(
+            "SELECT slot_id FROM trainer_bookings WHERE trainer_id = ? AND completed_at IS NULL ORDER BY slot_id",
+            (TRAINER,)
+        ).fetchall()
+
+    def test_release_completes_started_sessions_only(self):
+        book_series(TRAINER, MEMBER, [self.morning.id, self.evening.id], [self.today])
+        self.assertEqual(self.release(self.morning.start + 30), 1)
+
+        self.assertEqual(self.open_bookings(), [(self.evening.id,)])
+        schedule = DaySchedule(self.today, self.slots)
+        self.assertEqual(trainer_status(schedule, TRAINER, self.morning.start + 30),
+                         ("Available (next 17:00)", self.evening.start))
+
+    def test_released_slot_is_not_offered_again(self):
+        book_series(TRAINER, MEMBER, [self.morning.id], [self.today])
+        self.release(self.morning.start + 30)
+
+        schedule = DaySchedule(self.today, self.slots)
+        self.assertNotIn(self.morning, schedule.bookable_slots(TRAINER))
+        other = (2, "Member 000002", None, "", None)
+        bookable, conflicts = plan_series(TRAINER, other, [self.morning.id], [self.today])
+        self.assertEqual(bookable, [])
+        self.assertEqual(conflicts, [(self.today, self.morning, "trainer already held a session in this slot")])
+
+    def test_series_over_a_released_slot_books_the_other_dates(self):
+        book_series(TRAINER, MEMBER, [self.morning.id], [self.today])
+        self.release(self.morning.start + 30)
+
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        bookable, conflicts = book_series(TRAINER, MEMBER, [self.morning.id], [self.today, tomorrow])
+        self.assertEqual(bookable, [(tomorrow, self.morning)])
+        self.assertEqual([c[0] for c in conflicts], [self.today])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# thumbnail_cache.py
+import hashlib
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QImageReader, QPixmap
+
+from workers import Task
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_SIZE = 50
+MEMORY_BUDGET = 16 * 1024 * 1024   # bytes of decoded thumbnails kept in RAM
+
+
+def load_thumbnail(path, size=THUMBNAIL_SIZE, cache_dir=THUMBNAIL_DIR):
+    """Return a scaled QImage for ``path`` or None; safe to call off the GUI thread.
+
+    Reads the on-disk cache entry keyed by path + mtime + size when present,
+    otherwise decodes the original at reduced size and writes the entry.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    key = hashlib.sha1(f"{path}|{st.st_mtime_ns}|{st.st_size}|{size}".encode()).hexdigest()
+    cached = os.path.join(cache_dir, key + ".png")
+    if os.path.exists(cached):
+        image = QImage(cached)
+        if not image.isNull():
+            return image
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        # Lets the JPEG decoder skip most of the full-resolution work
+        reader.setScaledSize(source_size.scaled(size, size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > size or image.height() > size:
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cached + ".tmp"
+        if image.save(tmp, "PNG"):
+            os.replace(tmp, cached)
+    except OSError as e:
+        print("Thumbnail cache write failed:", e)
+    return image
+
+
+class ThumbnailCache(QObject):
+    """Two-tier photo thumbnail cache with background decoding.
+
+    icon() answers from the in-memory LRU or returns None and queues a load;
+    ``ready`` fires on the GUI thread once the icon for a path is available.
+    """
+    ready = pyqtSignal(str)
+
+    def __init__(self, size=THUMBNAIL_SIZE, max_bytes=MEMORY_BUDGET, cache_dir=THUMBNAIL_DIR, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._icons = OrderedDict()   # path -> (QIcon or None, bytes)
+        self._bytes = 0
+        self._pending = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+
+    def icon(self, path):
+        """Cached QIcon for ``path``, or None while it loads / if it has none."""
+        if path in self._icons:
+            self._icons.move_to_end(path)
+            return self._icons[path][0]
+        if path not in self._pending:
+            self._pending.add(path)
+            task = Task(path, load_thumbnail, path, self.size, self.cache_dir)
+            task.signals.finished.connect(self._loaded)
+            task.signals.failed.connect(self._failed)
+            self._pool.start(task)
+        return None
+
+    def is_missing(self, path):
+        """True once a load finished without producing an image."""
+        entry = self._icons.get(path)
+        return entry is not None and entry[0] is None
+
+    def clear(self):
+        self._pool.clear()
+        self._icons.clear()
+        self._pending.clear()
+        self._bytes = 0
+
+    def _loaded(self, path, image):
+        self._pending.discard(path)
+        if image is None:
+            self._store(path, None, 0)
+        else:
+            self._store(path, QIcon(QPixmap.fromImage(image)), image.sizeInBytes())
+        self.ready.emit(path)
+
+    def _failed(self, path, error):
+        self._pending.discard(path)
+        self._store(path, None, 0)
+        print("Thumbnail load failed:", error)
+        self.ready.emit(path)
+
+    def _store(self, path, icon, nbytes):
+        self._icons[path] = (icon, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and len(self._icons) > 1:
+            _, (_, evicted) = self._icons.popitem(last=False)
+            self._bytes -= evicted
+
+
+_shared = None
+
+
+def shared_thumbnail_cache():
+    """Process-wide cache instance (created on first use, needs a QApplication)."""
+    global _shared
+    if _shared is None:
+        _shared = ThumbnailCache()
+    return _shared
@@ -0,0 +1,170 @@
+# trainer_history.py
+"""Trainer booking history with utilization stats.
+
+Bookings page in newest first as the table scrolls, and the week / month
+utilization figures are aggregated in SQL, so the dialog costs the same
+to open for a new trainer as for one with years of bookings. A single
+Cancel button acts on the selected row instead of a button per booking.
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTableView, QTableWidget,
+    QTableWidgetItem, QAbstractItemView, QPushButton, QMessageBox
+)
+
+from availability import load_slots
+from db import (
+    get_trainer_history_page, get_trainer_totals, get_trainer_utilization, TRAINER_HISTORY_PAGE_SIZE
+)
+
+HEADERS = ["Date", "Slot", "Member", "Status", "Booking ID"]
+STATS_HEADERS = ["Period", "Sessions", "Slot-hours", "Members", "Cancelled"]
+STATS_PERIODS = 12
+
+
+class TrainerHistoryModel(QAbstractTableModel):
+    """One trainer's bookings, newest first, paged by keyset on (date, id)."""
+
+    def __init__(self, trainer_id, parent=None):
+        super().__init__(parent)
+        self.trainer_id = trainer_id
+        self._rows = get_trainer_history_page(trainer_id)
+        self._exhausted = len(self._rows) < TRAINER_HISTORY_PAGE_SIZE
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        last = self._rows[-1]
+        page = get_trainer_history_page(self.trainer_id, after=(last[0], last[1]))
+        if len(page) < TRAINER_HISTORY_PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def booking_id(self, row):
+        return self._rows[row][1]
+
+    def is_completed(self, row):
+        return self._rows[row][4] is not None
+
+    def remove_booking(self, booking_id):
+        for pos, row in enumerate(self._rows):
+            if row[1] == booking_id:
+                self.beginRemoveRows(QModelIndex(), pos, pos)
+                del self._rows[pos]
+                self.endRemoveRows()
+                return
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        booking_date, booking_id, name, slot, completed_at = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return (booking_date, slot or "(deleted slot)",
+                    name if name is not None else "(deleted member)",
+                    "Completed" if completed_at else "Scheduled", str(booking_id))[index.column()]
+        if role == Qt.TextAlignmentRole and index.column() == 4:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+
+class TrainerHistoryDialog(QDialog):
+    """History and utilization of one trainer.
+
+    ``cancel_booking(booking_id)`` is the tab's confirm-and-delete action;
+    it returns True when the booking was removed.
+    """
+
+    def __init__(self, trainer_id, trainer_name, cancel_booking, parent=None):
+        super().__init__(parent)
+        self.trainer_id = trainer_id
+        self.cancel_booking = cancel_booking
+        self.slot_minutes = {s.id: s.end - s.start for s in load_slots().values()}
+        self.setWindowTitle(f"Trainer Booking History: {trainer_name}")
+        layout = QVBoxLayout()
+
+        self.totals = QLabel()
+        layout.addWidget(self.totals)
+
+        period_bar = QHBoxLayout()
+        period_bar.addWidget(QLabel("Utilization"))
+        self.period_box = QComboBox()
+        self.period_box.addItem("By week", "week")
+        self.period_box.addItem("By month", "month")
+        self.period_box.currentIndexChanged.connect(self.load_stats)
+        period_bar.addWidget(self.period_box)
+        period_bar.addStretch()
+        layout.addLayout(period_bar)
+
+        self.stats = QTableWidget(0, len(STATS_HEADERS))
+        self.stats.setHorizontalHeaderLabels(STATS_HEADERS)
+        self.stats.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stats.verticalHeader().setVisible(False)
+        self.stats.setMaximumHeight(220)
+        layout.addWidget(self.stats)
+
+        self.model = TrainerHistoryModel(trainer_id, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        cancel_btn = QPushButton("Cancel Selected Booking")
+        cancel_btn.clicked.connect(self.cancel_selected)
+        layout.addWidget(cancel_btn)
+
+        self.setLayout(layout)
+        self.resize(640, 620)
+        self.load_stats()
+        self.table.resizeColumnsToContents()
+
+    def load_stats(self):
+        sessions, upcoming, hours, members, cancelled = get_trainer_totals(self.trainer_id, self.slot_minutes)
+        self.totals.setText(f"{sessions} sessions ({upcoming} upcoming), {hours:.1f} slot-hours, "
+                            f"{members} members, {cancelled} cancelled")
+
+        rows = get_trainer_utilization(self.trainer_id, self.slot_minutes,
+                                       self.period_box.currentData(), STATS_PERIODS)
+        self.stats.setRowCount(len(rows))
+        for row_index, (period, sessions, hours, members, cancelled) in enumerate(rows):
+            label = f"Week of {period}" if self.period_box.currentData() == "week" else period
+            values = [label, str(sessions), f"{hours:.1f}", str(members), str(cancelled)]
+            for col_index, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col_index:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.stats.setItem(row_index, col_index, item)
+        self.stats.resizeColumnsToContents()
+
+    def cancel_selected(self):
+        selected = self.table.selectionModel().selectedRows()
+        if not selected:
+            QMessageBox.warning(self, "Cancel Booking", "Select a booking to cancel.")
+            return
+        if self.model.is_completed(selected[0].row()):
+            QMessageBox.warning(self, "Cancel Booking", "This session was completed and cannot be cancelled.")
+            return
+        booking_id = self.model.booking_id(selected[0].row())
+        if self.cancel_booking(booking_id):
+            self.model.remove_booking(booking_id)
+            self.load_stats()
@@ -1,18 +1,31 @@
 # trainer_tab.py
-import sqlite3
+from datetime import date, datetime
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
-    QHBoxLayout, QLineEdit, QMessageBox, QComboBox, QDialog, QLabel, QDateEdit
+    QHBoxLayout, QLineEdit, QMessageBox, QComboBox, QDialog, QLabel, QDateEdit, QCheckBox
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 
-DB_NAME = "gym.db"
+from availability import (
+    DaySchedule, book_series, load_slots, slot_label, started_slot_ids, trainer_status, MINUTES_PER_DAY
+)
+from db import cancel_booking, complete_sessions, connect_db, transaction
+from change_hub import shared_change_hub, changes_to
+from member_picker import MemberPicker
+from series_booking import SeriesBookingDialog
+from trainer_history import TrainerHistoryDialog
 
 class TrainerTab(QWidget):
     def __init__(self):
         super().__init__()
+        self._trainer_rows = {}   # trainer id -> table row
+        self._schedule = None     # today's DaySchedule, drives the Status column
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.timeout.connect(self.update_statuses)
         self.init_ui()
         self.load_trainers()
+        shared_change_hub().changed.connect(self.apply_changes)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -34,6 +47,23 @@ class TrainerTab(QWidget):
         top_bar.addWidget(add_btn)
         layout.addLayout(top_bar)
 
+        # Free-trainer finder: hide trainers booked during a slot's time
+        free_bar = QHBoxLayout()
+        self.free_only = QCheckBox("Only trainers free on")
+        self.free_date = QDateEdit(QDate.currentDate())
+        self.free_date.setCalendarPopup(True)
+        self.free_date.setDisplayFormat("yyyy-MM-dd")
+        self.free_slot = QComboBox()
+        self.free_only.toggled.connect(self.apply_free_filter)
+        self.free_date.dateChanged.connect(self.apply_free_filter)
+        self.free_slot.currentIndexChanged.connect(self.apply_free_filter)
+        free_bar.addWidget(self.free_only)
+        free_bar.addWidget(self.free_date)
+        free_bar.addWidget(QLabel("during"))
+        free_bar.addWidget(self.free_slot)
+        free_bar.addStretch()
+        layout.addLayout(free_bar)
+
         # Trainer table
         self.table = QTableWidget()
         self.table.setColumnCount(8)
@@ -48,32 +78,124 @@ class TrainerTab(QWidget):
 
     def load_trainers(self):
         """Load all trainers and show book/release/history buttons."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = connect_db()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, name, phone, specialization, status FROM trainers")
+        cursor.execute("SELECT id, name, phone, specialization FROM trainers")
         rows = cursor.fetchall()
-        conn.close()
 
         self.table.setRowCount(0)
-        for row_index, row in enumerate(rows):
-            self.table.insertRow(row_index)
-            for col_index, value in enumerate(row):
-                self.table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
-
-            # Book button
-            book_btn = QPushButton("Book")
-            book_btn.clicked.connect(lambda checked, r=row: self.open_booking_dialog(r))
-            self.table.setCellWidget(row_index, 5, book_btn)
-
-            # Release button
-            release_btn = QPushButton("Release")
-            release_btn.clicked.connect(lambda checked, trainer_id=row[0]: self.release_trainer(trainer_id))
-            self.table.setCellWidget(row_index, 6, release_btn)
-
-            # History button
-            history_btn = QPushButton("History")
-            history_btn.clicked.connect(lambda checked, trainer_id=row[0]: self.show_history(trainer_id))
-            self.table.setCellWidget(row_index, 7, history_btn)
+        self._trainer_rows = {}
+        for row in rows:
+            self._add_trainer_row(row)
+
+        self.load_free_slots()
+        self.refresh_schedule()
+        self.apply_free_filter()
+
+    def _add_trainer_row(self, row):
+        row_index = self.table.rowCount()
+        self.table.insertRow(row_index)
+        for col_index, value in enumerate(row):
+            self.table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
+        self.table.setItem(row_index, 4, QTableWidgetItem(""))
+        self._trainer_rows[row[0]] = row_index
+
+        # Book button
+        book_btn = QPushButton("Book")
+        book_btn.clicked.connect(lambda checked, r=row: self.open_booking_dialog(r))
+        self.table.setCellWidget(row_index, 5, book_btn)
+
+        # Release button
+        release_btn = QPushButton("Release")
+        release_btn.setToolTip("Mark today's sessions that have started as completed; later sessions today stay booked")
+        release_btn.clicked.connect(lambda checked, trainer_id=row[0]: self.release_trainer(trainer_id))
+        self.table.setCellWidget(row_index, 6, release_btn)
+
+        # History button
+        history_btn = QPushButton("History")
+        history_btn.clicked.connect(lambda checked, trainer_id=row[0]: self.show_history(trainer_id))
+        self.table.setCellWidget(row_index, 7, history_btn)
+
+    def apply_changes(self, changes):
+        """Follow committed trainer, slot and booking changes from the change hub."""
+        trainers = changes_to(changes, "trainers")
+        slots = changes_to(changes, "slots")
+        bookings = changes_to(changes, "trainer_bookings")
+        if any(c.op != "insert" for c in trainers):
+            self.load_trainers()
+            return
+        for change in trainers:
+            row = connect_db().execute(
+                "SELECT id, name, phone, specialization FROM trainers WHERE id = ?", (change.row_id,)
+            ).fetchone()
+            if row is not None:
+                self._add_trainer_row(row)
+        if slots:
+            self.load_free_slots()
+        if trainers or slots or bookings:
+            # One query for today's bookings; statuses only change where they differ
+            self.refresh_schedule()
+            self.apply_free_filter()
+
+    def refresh_schedule(self):
+        """Re-read today's bookings after they change, then update statuses."""
+        self._schedule = DaySchedule(date.today().isoformat(), self._slots)
+        self.update_statuses()
+
+    def update_statuses(self):
+        """Derive each trainer's status from today's schedule and the clock.
+
+        Only cells whose text changes are touched. The timer is re-armed for
+        the next slot boundary of any trainer (or midnight), so the column
+        stays current without reloading the table.
+        """
+        if self._schedule is None:
+            return
+        if self._schedule.date != date.today().isoformat():
+            self._schedule = DaySchedule(date.today().isoformat(), self._slots)
+
+        now = datetime.now()
+        minute = now.hour * 60 + now.minute
+        next_change = MINUTES_PER_DAY
+        for trainer_id, row in self._trainer_rows.items():
+            text, changes_at = trainer_status(self._schedule, trainer_id, minute)
+            item = self.table.item(row, 4)
+            if item.text() != text:
+                item.setText(text)
+            if changes_at is not None:
+                next_change = min(next_change, changes_at)
+
+        elapsed = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+        self._status_timer.start(max(0, int((next_change * 60 - elapsed) * 1000)) + 100)
+
+    def load_free_slots(self):
+        """Refill the finder's slot list, keeping the current choice."""
+        current = self.free_slot.currentData()
+        self._slots = load_slots()
+        self.free_slot.blockSignals(True)
+        self.free_slot.clear()
+        for slot in self._slots.values():
+            self.free_slot.addItem(slot_label(slot), slot)
+            if current is not None and slot.id == current.id:
+                self.free_slot.setCurrentIndex(self.free_slot.count() - 1)
+        self.free_slot.blockSignals(False)
+
+    def apply_free_filter(self):
+        """Hide trainers with a booking overlapping the chosen date and slot."""
+        slot = self.free_slot.currentData()
+        if not self.free_only.isChecked() or slot is None:
+            for row in range(self.table.rowCount()):
+                self.table.setRowHidden(row, False)
+            return
+        schedule = DaySchedule(self.free_date.date().toString("yyyy-MM-dd"), self._slots)
+        for row in range(self.table.rowCount()):
+            trainer_id = int(self.table.item(row, 0).text())
+            self.table.setRowHidden(row, not schedule.trainer_free(trainer_id, slot.start, slot.end))
+
+    def clear_session(self):
+        self.name_input.clear()
+        self.phone_input.clear()
+        self.special_input.clear()
 
     def add_trainer(self):
         name = self.name_input.text().strip()
@@ -83,182 +205,143 @@ class TrainerTab(QWidget):
             QMessageBox.warning(self, "Input Error", "Trainer name is required")
             return
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO trainers (name, phone, specialization) VALUES (?, ?, ?)", (name, phone, special))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute("INSERT INTO trainers (name, phone, specialization) VALUES (?, ?, ?)", (name, phone, special))
             QMessageBox.information(self, "Success", "Trainer added successfully!")
             self.name_input.clear()
             self.phone_input.clear()
             self.special_input.clear()
-            self.load_trainers()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add trainer: {e}")
 
     def open_booking_dialog(self, trainer_row):
-        trainer_id, trainer_name, _, _, status = trainer_row
+        trainer_id, trainer_name, _, _ = trainer_row
 
         dialog = QDialog(self)
         dialog.setWindowTitle(f"Book Trainer: {trainer_name}")
         layout = QVBoxLayout()
 
-        # Member selection
-        member_combo = QComboBox()
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, gender FROM members WHERE end_date >= date('now')")
-        members = cursor.fetchall()
-        conn.close()
-
-        member_map = {}
-        for m in members:
-            member_map[f"{m[1]} ({m[2]})"] = m[0]
-            member_combo.addItem(f"{m[1]} ({m[2]})")
-
-        # Slot selection
-        slot_combo = QComboBox()
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, start_time, end_time, gender FROM slots ORDER BY start_time")
-        slots = cursor.fetchall()
-        conn.close()
-
-        slot_map = {}
-        for s in slots:
-            slot_map[f"{s[1]} - {s[2]} ({s[3]})"] = s[0]
-            slot_combo.addItem(f"{s[1]} - {s[2]} ({s[3]})")
+        # Member selection (active members only, looked up as you type)
+        member_picker = MemberPicker(active_only=True)
+        member_picker.setMinimumWidth(320)
 
         # Booking date
         date_input = QDateEdit()
         date_input.setDate(QDate.currentDate())
         date_input.setCalendarPopup(True)
 
-        # Save booking button
+        # Slot selection: only slots this trainer (and member) can still take
+        slot_combo = QComboBox()
+        slot_hint = QLabel()
+        slots = load_slots()
         save_btn = QPushButton("Confirm Booking")
-        def confirm_booking():
-            member_text = member_combo.currentText()
-            slot_text = slot_combo.currentText()
-            member_id = member_map[member_text]
-            slot_id = slot_map[slot_text]
-            booking_date = date_input.date().toString("yyyy-MM-dd")
 
-            # Check gender compatibility
-            member_gender = member_text.split("(")[1][:-1]
-            slot_gender = slot_text.split("(")[1][:-1]
-            if slot_gender != "Mixed" and member_gender != slot_gender:
-                QMessageBox.warning(dialog, "Gender Mismatch", "This member's gender does not match the slot's gender.")
+        def refresh_slots():
+            schedule = DaySchedule(date_input.date().toString("yyyy-MM-dd"), slots)
+            member = member_picker.member()
+            if member is None:
+                bookable = schedule.bookable_slots(trainer_id)
+            else:
+                bookable = schedule.bookable_slots(trainer_id, member[0], member[2])
+            slot_combo.clear()
+            for slot in bookable:
+                slot_combo.addItem(slot_label(slot), slot)
+            save_btn.setEnabled(bool(bookable))
+            if not bookable:
+                slot_hint.setText("No bookable slots on this date.")
+            elif member is None:
+                slot_hint.setText(f"{len(bookable)} of {len(slots)} slots free. Pick a member to check gender and their sessions.")
+            else:
+                slot_hint.setText(f"{len(bookable)} of {len(slots)} slots bookable for {member[1]}.")
+
+        member_picker.memberChanged.connect(refresh_slots)
+        date_input.dateChanged.connect(refresh_slots)
+        refresh_slots()
+
+        # Save booking button
+        def confirm_booking():
+            member = member_picker.member()
+            if member is None:
+                QMessageBox.warning(dialog, "Input Error", "Select a member from the suggestions.")
+                return
+            slot = slot_combo.currentData()
+            if slot is None:
+                QMessageBox.warning(dialog, "Input Error", "No bookable slot selected.")
                 return
+            booking_date = date_input.date().toString("yyyy-MM-dd")
 
             try:
-                conn = sqlite3.connect(DB_NAME)
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO trainer_bookings (trainer_id, member_id, slot_id, booking_date)
-                    VALUES (?, ?, ?, ?)
-                """, (trainer_id, member_id, slot_id, booking_date))
-                # Update status only if booking is today
-                if booking_date == QDate.currentDate().toString("yyyy-MM-dd"):
-                    cursor.execute("UPDATE trainers SET status='Training' WHERE id=?", (trainer_id,))
-                conn.commit()
-                conn.close()
+                # Re-checked against the bookings as they are now, then inserted
+                _, conflicts = book_series(trainer_id, member, [slot.id], [booking_date])
+                if conflicts:
+                    QMessageBox.warning(dialog, "Cannot Book", f"Cannot book: {conflicts[0][2]}.")
+                    refresh_slots()
+                    return
                 QMessageBox.information(dialog, "Success", "Trainer booked successfully!")
-                self.load_trainers()
                 dialog.close()
             except Exception as e:
                 QMessageBox.critical(dialog, "Error", f"Failed to book trainer: {e}")
 
         save_btn.clicked.connect(confirm_booking)
 
+        # Recurring bookings open their own dialog for the same trainer and member
+        series_btn = QPushButton("Book Series...")
+        def open_series():
+            series = SeriesBookingDialog(trainer_id, trainer_name, member_picker.member(), dialog)
+            series.exec_()
+            if series.booked:
+                dialog.close()
+        series_btn.clicked.connect(open_series)
+
         layout.addWidget(QLabel("Select Member:"))
-        layout.addWidget(member_combo)
-        layout.addWidget(QLabel("Select Slot:"))
-        layout.addWidget(slot_combo)
+        layout.addWidget(member_picker)
         layout.addWidget(QLabel("Booking Date:"))
         layout.addWidget(date_input)
+        layout.addWidget(QLabel("Select Slot:"))
+        layout.addWidget(slot_combo)
+        layout.addWidget(slot_hint)
         layout.addWidget(save_btn)
+        layout.addWidget(series_btn)
         dialog.setLayout(layout)
         dialog.exec_()
 
     def release_trainer(self, trainer_id):
-        """Release trainer and optionally remove today's booking"""
-        confirm = QMessageBox.question(self, "Release Trainer", "Release this trainer and remove today's booking?",
+        """Complete the trainer's sessions that have started today; later ones stay booked"""
+        confirm = QMessageBox.question(self, "Release Trainer",
+                                       "Mark this trainer's sessions that have started today as completed?\n"
+                                       "Sessions later today stay booked.",
                                        QMessageBox.Yes | QMessageBox.No)
         if confirm == QMessageBox.Yes:
+            now = datetime.now()
+            minute = now.hour * 60 + now.minute
+            started = started_slot_ids(self._slots, minute)
             try:
-                conn = sqlite3.connect(DB_NAME)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM trainer_bookings WHERE trainer_id=? AND booking_date=date('now')", (trainer_id,))
-                cursor.execute("UPDATE trainers SET status='Available' WHERE id=?", (trainer_id,))
-                conn.commit()
-                conn.close()
-                QMessageBox.information(self, "Success", "Trainer released.")
-                self.load_trainers()
+                with transaction():
+                    completed = complete_sessions(trainer_id, now.strftime("%Y-%m-%d"), started)
+                if completed:
+                    QMessageBox.information(self, "Success", f"Trainer released; {completed} session(s) completed.")
+                else:
+                    QMessageBox.information(self, "Info", "This trainer has no started session open today.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to release trainer: {e}")
 
     def show_history(self, trainer_id):
-        """Show all bookings (past and future) for this trainer"""
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Trainer Booking History")
-        layout = QVBoxLayout()
-
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels(["Booking ID", "Member Name", "Slot", "Date", "Cancel"])
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT tb.id, m.name, s.start_time || '-' || s.end_time || ' (' || s.gender || ')', tb.booking_date
-            FROM trainer_bookings tb
-            JOIN members m ON tb.member_id = m.id
-            JOIN slots s ON tb.slot_id = s.id
-            WHERE tb.trainer_id=?
-            ORDER BY tb.booking_date
-        """, (trainer_id,))
-        bookings = cursor.fetchall()
-        conn.close()
-
-        table.setRowCount(0)
-        for row_index, b in enumerate(bookings):
-            table.insertRow(row_index)
-            for col_index, value in enumerate(b):
-                table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
-
-            # Cancel booking button
-            cancel_btn = QPushButton("Cancel")
-            cancel_btn.clicked.connect(lambda checked, booking_id=b[0]: self.cancel_booking(booking_id))
-            table.setCellWidget(row_index, 4, cancel_btn)
-
-        layout.addWidget(table)
-        dialog.setLayout(layout)
-        dialog.exec_()
+        """Show this trainer's bookings (newest first) and utilization"""
+        row = self._trainer_rows.get(trainer_id)
+        name = self.table.item(row, 1).text() if row is not None else ""
+        TrainerHistoryDialog(trainer_id, name, self.cancel_booking, self).exec_()
 
     def cancel_booking(self, booking_id):
-        """Cancel specific booking and update trainer status if needed"""
+        """Cancel specific booking (logged as cancelled); returns True if it was removed"""
         confirm = QMessageBox.question(self, "Cancel Booking", "Are you sure you want to cancel this booking?",
                                        QMessageBox.Yes | QMessageBox.No)
         if confirm != QMessageBox.Yes:
-            return
+            return False
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-
-            # Get trainer id and booking date
-            cursor.execute("SELECT trainer_id, booking_date FROM trainer_bookings WHERE id=?", (booking_id,))
-            row = cursor.fetchone()
-            if row:
-                trainer_id, booking_date = row
-                cursor.execute("DELETE FROM trainer_bookings WHERE id=?", (booking_id,))
-                # If booking is today, mark trainer available
-                from datetime import datetime
-                if booking_date == datetime.today().strftime("%Y-%m-%d"):
-                    cursor.execute("UPDATE trainers SET status='Available' WHERE id=?", (trainer_id,))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", "Booking canceled.")
-            self.load_trainers()
+            with transaction():
+                cancelled = cancel_booking(booking_id)
+            QMessageBox.information(self, "Success", "Booking canceled." if cancelled else "Booking was already removed.")
+            return True
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to cancel booking: {e}")
+            return False
@@ -0,0 +1,61 @@
+# workers.py
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object, object)   # tag, result
+    failed = pyqtSignal(object, str)        # tag, error text
+    progress = pyqtSignal(object, object)   # tag, progress payload
+
+
+class Task(QRunnable):
+    """Run ``fn(*args, **kwargs)`` on a pool thread and report back by signal.
+
+    ``tag`` is passed through untouched so the receiver can tell which request
+    a result belongs to and drop stale ones. Connect the signals to methods of
+    a GUI-thread QObject so the slots run on the GUI thread.
+
+    With ``with_progress=True`` the function also receives a ``progress``
+    callable; whatever it is called with is emitted as ``progress``. With
+    ``cancellable=True`` it receives ``cancelled``, a callable that turns
+    True once cancel() has been called from any thread.
+    """
+
+    def __init__(self, tag, fn, *args, with_progress=False, cancellable=False, **kwargs):
+        super().__init__()
+        self.tag = tag
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+        self._cancelled = False
+        if with_progress:
+            self.kwargs["progress"] = self.report
+        if cancellable:
+            self.kwargs["cancelled"] = self.is_cancelled
+
+    def report(self, *values):
+        self.signals.progress.emit(self.tag, values)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception:
+            self.signals.failed.emit(self.tag, traceback.format_exc())
+        else:
+            self.signals.finished.emit(self.tag, result)
+
+
+def single_thread_pool(parent=None):
+    """A pool that runs one task at a time; clear() drops queued work."""
+    pool = QThreadPool(parent)
+    pool.setMaxThreadCount(1)
+    return pool